@@ -0,0 +1,60 @@
+# Throughput of the expression lexers, in tokens/second, on one long
+# machine-generated expression, alone and feeding IterativeExpressionParser.
+# Run with `python benchmarks/expr_lexer.py [--terms N]`.
+import argparse
+import io
+import random
+import time
+
+from cs6th_ch7.expr.lexer import Lexer
+from cs6th_ch7.expr.parser import IterativeExpressionParser
+from cs6th_ch7.expr.regex_lexer import RegexLexer
+
+
+def expression(terms: int, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    ret = [str(rng.randint(-999, 999))]
+    for _ in range(terms - 1):
+        operand = str(rng.randint(-999, 999))
+        if rng.random() < 0.2:
+            operand = f"({operand} + {rng.randint(0, 99)})"
+        ret.append(f"{rng.choice('+*')} {operand}")
+    return " ".join(ret) + "\n"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--terms", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    text = expression(args.terms)
+
+    count = sum(1 for _ in Lexer(io.StringIO(text)))
+
+    def lex(engine):
+        for _ in engine(io.StringIO(text)):
+            pass
+
+    def parse(engine):
+        IterativeExpressionParser(io.StringIO(text), engine).E()
+
+    for name, run in (("lex", lex), ("lex+parse", parse)):
+        rates = {}
+        for engine in (Lexer, RegexLexer):
+            # Best of several runs, since other load only ever slows us down.
+            elapsed = float("inf")
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                run(engine)
+                elapsed = min(elapsed, time.perf_counter() - start)
+            rates[engine] = count / elapsed
+            print(
+                f"{name:9} {engine.__name__:10} {rates[engine]:12,.0f} tokens/s"
+            )
+        print(
+            f"{name:9} {'speedup':10} {rates[RegexLexer] / rates[Lexer]:12.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+# Benchmark for the Pep/10 parser's error recovery: lines/second per lexing
+# engine on a valid program, and on one where most lines are malformed.
+# Run with `python benchmarks/recovery.py [--lines N]`.
+import argparse
+import random
+import time
+
+from cs6th_ch7.pep10.dfa_lexer import DFALexer
+from cs6th_ch7.pep10.lexer import Lexer
+from cs6th_ch7.pep10.parser import parse
+from cs6th_ch7.pep10.regex_lexer import RegexLexer
+
+from tokens import program
+
+# Each fails early, leaving most of the line for recovery to skip.
+MALFORMED = [
+    "FOO 0x10,i ;unknown mnemonic with a long trailing comment",
+    "LDWA lbl,q ;unknown addressing mode",
+    "BR 99999,i a b c d e f g h",
+    "STWA 0x10,i ;invalid addressing mode",
+    "lbl: ;symbol without instruction",
+    "@ LDWA 1,i ;fails on the first token",
+]
+
+
+def malformed(lines: int, ratio: float, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    valid = program(lines, seed).splitlines()
+    ret = [
+        rng.choice(MALFORMED) if rng.random() < ratio else line
+        for line in valid
+    ]
+    return "\n".join(ret) + "\n"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--lines", type=int, default=50_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    inputs = {
+        "valid": program(args.lines),
+        "90% malformed": malformed(args.lines, 0.9),
+    }
+
+    for engine in (Lexer, RegexLexer, DFALexer):
+        for name, text in inputs.items():
+            # Best of several runs, since other load only ever slows us down.
+            elapsed = float("inf")
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                parse(text, lexer_type=engine)
+                elapsed = min(elapsed, time.perf_counter() - start)
+            print(
+                f"{engine.__name__:11} {name:14}"
+                f" {args.lines / elapsed:10,.0f} lines/s"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+# Peak memory of batch and streaming assembly as programs grow. The program
+# only refers back to symbols already declared, so the streaming pipeline
+# never has lines pending. Run with `python benchmarks/stream.py [--lines N]`.
+import argparse
+import io
+import os
+import tempfile
+import time
+import tracemalloc
+
+from cs6th_ch7.pep10.code_gen import calculate_addresses, emit_program
+from cs6th_ch7.pep10.parser import parse_file
+from cs6th_ch7.pep10.pipeline import assemble_stream
+
+
+# Half comments, so that the largest programs still fit in 64 KiB.
+def program(lines: int) -> str:
+    ret = []
+    for index in range(lines):
+        if index % 2:
+            ret.append(f"; comment number {index}")
+        elif index % 16 == 0:
+            ret.append(f"lbl{index}: LDWA 0x{index & 0xFFFF:04X},d ;c")
+        else:
+            ret.append(f"       ADDA lbl{index - index % 16},d ;c")
+    return "\n".join(ret) + "\n"
+
+
+def batch(path: str) -> None:
+    ir, errors = calculate_addresses(parse_file(path))
+    assert not errors
+    with open(os.devnull, "w") as listing_out:
+        emit_program(ir, listing_out)
+
+
+def stream(path: str) -> None:
+    with open(path) as f, open(os.devnull, "w") as listing_out:
+        assert not assemble_stream(f, io.BytesIO(), listing_out)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--lines", type=int, default=40_000)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as directory:
+        for lines in (args.lines // 8, args.lines // 4, args.lines):
+            path = os.path.join(directory, f"{lines}.pep")
+            with open(path, "w") as f:
+                f.write(program(lines))
+            for assemble in (batch, stream):
+                tracemalloc.start()
+                start = time.perf_counter()
+                assemble(path)
+                elapsed = time.perf_counter() - start
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                print(
+                    f"{assemble.__name__:6} {lines:7,} lines"
+                    f" {peak / 1024:10,.0f} KiB peak {elapsed:6.2f} s"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+# Symbol table costs on programs with many labels: retained bytes per symbol,
+# lookups/second, and the time and pickled size of a table to merge.
+# Run with `python benchmarks/symbols.py [--symbols N]`.
+import argparse
+import pickle
+import time
+import tracemalloc
+
+from cs6th_ch7.pep10.symbol import SymbolTable
+
+
+def build(names) -> SymbolTable:
+    table = SymbolTable()
+    for name in names:
+        table.define(name).value = len(name)
+        table.reference(name)
+    return table
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--symbols", type=int, default=50_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    names = [f"label{index}" for index in range(args.symbols)]
+
+    tracemalloc.start()
+    table = build(names)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"retained  {size / args.symbols:10,.0f} bytes/symbol")
+
+    # Best of several runs, since other load only ever slows us down.
+    lookup, merge = float("inf"), float("inf")
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        for name in names:
+            table.reference(name)
+        lookup = min(lookup, time.perf_counter() - start)
+
+        other = pickle.loads(pickle.dumps(table))
+        start = time.perf_counter()
+        SymbolTable().merge(other)
+        merge = min(merge, time.perf_counter() - start)
+
+    print(f"lookup    {args.symbols / lookup:10,.0f} lookups/s")
+    print(f"merge     {merge * 1000:10,.1f} ms")
+    print(
+        f"pickled   {len(pickle.dumps(table)) / args.symbols:10,.1f} bytes/symbol"
+    )
+
+
+if __name__ == "__main__":
+    main()
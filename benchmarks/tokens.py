@@ -0,0 +1,66 @@
+# Microbenchmark for Pep/10 token allocation: tokens/second per lexing engine,
+# and retained bytes per token when a whole program's tokens are kept alive.
+# Run with `python benchmarks/tokens.py [--lines N]`.
+import argparse
+import io
+import random
+import time
+import tracemalloc
+
+from cs6th_ch7.pep10.dfa_lexer import DFALexer
+from cs6th_ch7.pep10.lexer import Lexer
+from cs6th_ch7.pep10.regex_lexer import RegexLexer
+
+MNEMONICS = ["LDWA", "STWA", "ADDA", "SUBSP", "BR", "CALL", "ldba", "ORX"]
+MODES = ["i", "d", "s", "sfx", "x"]
+
+
+def program(lines: int, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    ret = []
+    for index in range(lines):
+        if rng.random() < 0.1:
+            ret.append(f"; comment number {index}")
+            continue
+        symbol = f"lbl{index}: " if rng.random() < 0.2 else ""
+        argument = rng.choice(
+            [
+                str(rng.randint(-100, 3000)),
+                f"0x{rng.randint(0, 0xFFFF):04X}",
+                f"lbl{rng.randint(0, lines)}",
+            ]
+        )
+        mnemonic, mode = rng.choice(MNEMONICS), rng.choice(MODES)
+        ret.append(f"{symbol:7}{mnemonic} {argument},{mode} ;c")
+    return "\n".join(ret) + "\n"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--lines", type=int, default=50_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    text = program(args.lines)
+
+    for engine in (Lexer, RegexLexer, DFALexer):
+        # Best of several runs, since other load only ever slows us down.
+        elapsed = float("inf")
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            count = sum(1 for _ in engine(io.StringIO(text)))
+            elapsed = min(elapsed, time.perf_counter() - start)
+
+        tracemalloc.start()
+        retained = list(engine(io.StringIO(text)))
+        size, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del retained
+
+        print(
+            f"{engine.__name__:11} {count / elapsed:12,.0f} tokens/s"
+            f" {size / count:8.1f} bytes/token"
+        )
+
+
+if __name__ == "__main__":
+    main()
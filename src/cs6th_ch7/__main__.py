@@ -1,19 +1,17 @@
 import argparse
+import itertools
 
 from cs6th_ch7.expr.code_gen import expression_string, to_pep10_ir
-from cs6th_ch7.expr.parser import ExpressionParser
+from cs6th_ch7.expr.parser import ExpressionParser, IterativeExpressionParser
 from .fsm import Direct, Table, HexDirect
 import io
 from .pep10.lexer import Lexer
-from .pep10.code_gen import (
-    calculate_addresses,
-    program_object_code,
-    program_listing,
-    program_source,
-)
+from .pep10.code_gen import calculate_addresses, emit_program, program_listing
 from .pep10.ir import ErrorLine
-from .pep10.parser import parse
-from .pep10.symbol import SymbolTable, add_OS_symbols
+from .pep10.one_pass import assemble
+from .pep10.parser import Parser, parse, parse_file, parse_parallel
+from .pep10.pipeline import assemble_stream
+from .pep10.symbol import OS_SYMBOLS, SymbolTable
 import sys
 
 
@@ -22,7 +20,7 @@ def text_from_args(args):
         return args.text
     elif "file" in args and args.file is not None:
         with open(args.file, "r") as f:
-            return "".join(f.readlines())
+            return f.read()
     else:
         raise RuntimeError("Expected either text or file")
 
@@ -62,14 +60,18 @@ def exec_lex(args):
         print(repr(token))
 
 
-def parse_wrapper(text: str):
-    st = SymbolTable()
-    add_OS_symbols(st)
-    ir = parse(text, symbol_table=st)
-    return ir
+def parse_wrapper(args):
+    st = SymbolTable(OS_SYMBOLS)
+    if "jobs" in args and args.jobs is not None and args.jobs > 1:
+        return parse_parallel(text_from_args(args), st, jobs=args.jobs)
+    # Files are lexed directly from a memory map rather than read into a str.
+    if "file" in args and args.file is not None:
+        return parse_file(args.file, symbol_table=st)
+    return parse(text_from_args(args), symbol_table=st)
 
 
-def generate_code_wrapper(parse_tree):
+# Returns the object code, and streams the listing and source to any writers.
+def generate_code_wrapper(parse_tree, listing_out=None, source_out=None):
     parse_errors = list(filter(lambda n: type(n) is ErrorLine, parse_tree))
     if len(parse_errors) > 0:
         for error in parse_errors:
@@ -80,18 +82,20 @@ def generate_code_wrapper(parse_tree):
         for ir_error in ir_errors:
             print(ir_error, file=sys.stderr)
         raise SyntaxError("Failed to generate object code")
-    return (
-        program_object_code(ir),
-        program_listing(ir),
-        program_source(ir),
-    )
+    return emit_program(ir, listing_out, source_out)
+
+
+def expression_parser(args):
+    if "iterative" in args and args.iterative:
+        return IterativeExpressionParser
+    return ExpressionParser
 
 
 def exec_expr(args):
     text = text_from_args(args)
     # Remove trailing whitespace while insuring input is \n terminated.
     buffer = io.StringIO(text.rstrip() + "\n")
-    parser = ExpressionParser(buffer)
+    parser = expression_parser(args)(buffer)
     expr_tokens = parser.E()
     print(expression_string(expr_tokens))
 
@@ -100,9 +104,16 @@ def exec_expr_codegen(args):
     text = text_from_args(args)
     # Remove trailing whitespace while insuring input is \n terminated.
     buffer = io.StringIO(text.rstrip() + "\n")
-    parser = ExpressionParser(buffer)
+    parser = expression_parser(args)(buffer)
     expr_tokens = parser.E()
-    ir_lines = to_pep10_ir(expr_tokens)
+    optimize = "optimize" in args and args.optimize
+    ir_lines = to_pep10_ir(
+        expr_tokens,
+        fold=optimize,
+        share=optimize,
+        reduce=optimize,
+        cache=optimize,
+    )
     ir, ir_errors = calculate_addresses(ir_lines)
     if len(ir_errors) > 0:
         for ir_error in ir_errors:
@@ -112,16 +123,46 @@ def exec_expr_codegen(args):
 
 
 def exec_parser(args):
-    text = text_from_args(args)
-    for line in parse_wrapper(text):
+    for line in parse_wrapper(args):
         print(repr(line))
 
 
+# Assemble while parsing, printing object code in Pep/10's hex format.
+def exec_one_pass(args):
+    st = SymbolTable(OS_SYMBOLS)
+    buffer = io.StringIO(text_from_args(args).rstrip() + "\n")
+    object_code, errors = assemble(Parser(buffer, symbol_table=st))
+    if len(errors) > 0:
+        for error in errors:
+            print(error, file=sys.stderr)
+        raise SyntaxError("Failed to generate object code")
+    hex_bytes = [f"{byte:02X}" for byte in object_code]
+    rows = itertools.batched(hex_bytes + ["zz"], 16)
+    print("\n".join(" ".join(row) for row in rows))
+
+
+# Stream the listing while assembling, without holding the program in memory.
+def exec_stream(args):
+    st = SymbolTable(OS_SYMBOLS)
+    if "file" in args and args.file is not None:
+        with open(args.file, "r") as f:
+            errors = assemble_stream(f, listing_out=sys.stdout, symbol_table=st)
+    else:
+        text = io.StringIO(text_from_args(args))
+        errors = assemble_stream(text, listing_out=sys.stdout, symbol_table=st)
+    if len(errors) > 0:
+        for error in errors:
+            print(error, file=sys.stderr)
+        raise SyntaxError("Failed to generate object code")
+
+
 def exec_codegen(args):
-    text = text_from_args(args)
-    ir = parse_wrapper(text)
-    code, listing, source = generate_code_wrapper(ir)
-    print("\n".join(listing))
+    if args.one_pass:
+        return exec_one_pass(args)
+    elif args.stream:
+        return exec_stream(args)
+    ir = parse_wrapper(args)
+    generate_code_wrapper(ir, listing_out=sys.stdout)
 
 
 def main():
@@ -173,6 +214,11 @@ def main():
     parse_expr_group = parse_expr.add_mutually_exclusive_group(required=True)
     parse_expr_group.add_argument("--text")
     parse_expr_group.add_argument("--file")
+    parse_expr.add_argument(
+        "--iterative",
+        action="store_true",
+        help="Parse without recursion, for long machine-generated expressions",
+    )
 
     parse_parser = subparsers.add_parser(
         "parser", help="A recursive descent parser for Pep/10 (Figure 7.49)"
@@ -193,12 +239,41 @@ def main():
     )
     parse_codegen_group.add_argument("--text")
     parse_codegen_group.add_argument("--file")
+    # Ways of assembling; each ignores the others' options.
+    parse_codegen_mode = parse_codegen.add_mutually_exclusive_group()
+    parse_codegen_mode.add_argument(
+        "--one-pass",
+        action="store_true",
+        help="Emit object code while parsing, patching forward references",
+    )
+    parse_codegen_mode.add_argument(
+        "--stream",
+        action="store_true",
+        help="Write the listing while parsing, holding back only lines with"
+        " pending forward references",
+    )
+    parse_codegen_mode.add_argument(
+        "--jobs",
+        type=int,
+        help="Parse chunks of the program in this many processes",
+    )
 
     parse_compile = subparsers.add_parser(
         "exprcode",
         help="A code generator for an expression grammar (Figure 7.xx)",
     )
     parse_compile.set_defaults(func=exec_expr_codegen)
+    parse_compile.add_argument(
+        "--iterative",
+        action="store_true",
+        help="Parse without recursion, for long machine-generated expressions",
+    )
+    parse_compile.add_argument(
+        "--optimize",
+        action="store_true",
+        help="Fold constants, compute repeated subexpressions once, multiply "
+        "by constants inline, and keep the top of the stack in A and X",
+    )
     parse_compile = parse_compile.add_mutually_exclusive_group(required=True)
     parse_compile.add_argument("--text")
     parse_compile.add_argument("--file")
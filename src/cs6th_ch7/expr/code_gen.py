@@ -1,13 +1,17 @@
-from typing import List, cast, Sequence
+from typing import Dict, List, Set, cast, Sequence
+import cs6th_ch7.expr.optimize as optimize
 import cs6th_ch7.expr.tokens as tokens
+from .optimize import Item, Temporary, constant_products, constant_sums
+from .optimize import fold_constants, share_subexpressions
 from .tokens import Token
 from ..pep10.operands import Decimal, Identifier
 from ..pep10.symbol import SymbolTable
+from ..pep10.flyweight import Flyweights
 from ..pep10.ir import DyadicLine, MonadicLine, IRLine
 from ..pep10.mnemonics import AddressingMode as AM
 
 
-def expression_string(expression: List[Token]) -> str:
+def expression_string(expression: Sequence[Item]) -> str:
     return " ".join(token.postfix_format() for token in expression)
 
 
@@ -21,14 +25,26 @@ def plus_ir(symbol_table: SymbolTable) -> List[IRLine]:
     ]
 
 
+# The loop runs once per bit up to arg2's highest set bit, so arg2 is made the
+# smaller of the two as unsigned words. Only if both are negative does it
+# never reach zero.
 def times_ir(symbol_table: SymbolTable) -> List[IRLine]:
     arg1, arg2, tmp = 6, 4, 0
     return [
         DyadicLine(
             "SUBSP", Decimal(2), AM.I, symbol_decl=symbol_table.define("times")
         ),
+        # Swap the arguments unless arg1 >= arg2, unsigned
+        DyadicLine("LDWA", Decimal(arg1), AM.S),
+        DyadicLine("CPWA", Decimal(arg2), AM.S),
+        DyadicLine("BRC", Identifier(symbol_table.reference("t_init")), AM.I),
+        DyadicLine("LDWX", Decimal(arg2), AM.S),
+        DyadicLine("STWA", Decimal(arg2), AM.S),
+        DyadicLine("STWX", Decimal(arg1), AM.S),
         # Initialize accumulation variable to 0
-        DyadicLine("LDWA", Decimal(0), AM.I),
+        DyadicLine(
+            "LDWA", Decimal(0), AM.I, symbol_decl=symbol_table.define("t_init")
+        ),
         DyadicLine("STWA", Decimal(tmp), AM.S),
         DyadicLine(
             "LDWA",
@@ -62,29 +78,245 @@ def times_ir(symbol_table: SymbolTable) -> List[IRLine]:
     ]
 
 
-def to_pep10_ir(expression: List[Token]) -> Sequence[IRLine]:
-    symbol_table = SymbolTable()
+# Multiply a register by a constant, non-negative multiplier, given a copy of
+# its value at offset,s. Horner's rule over the multiplier's bits: shift for
+# each bit after the leading one, and add the multiplicand back in for each
+# one which is set.
+def multiply_ir(
+    pool: Flyweights, multiplier: int, register: str = "A", offset: int = 0
+) -> List[IRLine]:
+    if multiplier == 1:
+        return []
+    elif multiplier == 0:
+        return [pool.line(f"LDW{register}", pool.decimal(0), AM.I)]
     ret: List[IRLine] = []
-    for token in expression:
-        match type(token):
+    for bit in f"{multiplier:b}"[1:]:
+        ret.append(pool.line(f"ASL{register}"))
+        if bit == "1":
+            ret.append(pool.line(f"ADD{register}", pool.decimal(offset), AM.S))
+    return ret
+
+
+# Every value lives on the stack; A holds the top one only after it is pushed.
+def _stacked_ir(
+    items: List[Item],
+    products: Dict[int, int],
+    skipped: Set[int],
+    symbol_table: SymbolTable,
+    pool: Flyweights,
+) -> List[IRLine]:
+    ret: List[IRLine] = []
+    # Values on the stack, so that temporaries can be found from the top.
+    depth = 0
+    for index, item in enumerate(items):
+        match type(item):
+            case tokens.Decimal if index in skipped:
+                # Multiplied in by its product instead.
+                pass
             case tokens.Decimal:
-                casted = cast(Decimal, token)
-                ret.append(DyadicLine("SUBSP", Decimal(2), AM.I))
-                ret.append(DyadicLine("LDWA", Decimal(casted.value), AM.I))
-                ret.append(DyadicLine("STWA", Decimal(0), AM.S))
+                casted = cast(Decimal, item)
+                ret.append(pool.line("SUBSP", pool.decimal(2), AM.I))
+                ret.append(pool.line("LDWA", pool.decimal(casted.value), AM.I))
+                ret.append(pool.line("STWA", pool.decimal(0), AM.S))
+                depth += 1
+            case optimize.Temporary:
+                offset = 2 * (depth - cast(Temporary, item).index)
+                ret.append(pool.line("SUBSP", pool.decimal(2), AM.I))
+                ret.append(pool.line("LDWA", pool.decimal(offset), AM.S))
+                ret.append(pool.line("STWA", pool.decimal(0), AM.S))
+                depth += 1
             case tokens.Plus:
-                sym_plus = symbol_table.reference("plus")
-                ret.append(DyadicLine("CALL", Identifier(sym_plus), AM.I))
-                ret.append(DyadicLine("ADDSP", Decimal(2), AM.I))
-                ret.append(DyadicLine("STWA", Decimal(0), AM.S))
+                sym_plus = pool.identifier(symbol_table.reference("plus"))
+                ret.append(pool.line("CALL", sym_plus, AM.I))
+                ret.append(pool.line("ADDSP", pool.decimal(2), AM.I))
+                ret.append(pool.line("STWA", pool.decimal(0), AM.S))
+                depth -= 1
+            case tokens.Times if index in products:
+                if lines := multiply_ir(pool, products[index]):
+                    ret.extend(lines)
+                    ret.append(pool.line("STWA", pool.decimal(0), AM.S))
             case tokens.Times:
-                sym_times = symbol_table.reference("times")
-                ret.append(DyadicLine("CALL", Identifier(sym_times), AM.I))
-                ret.append(DyadicLine("ADDSP", Decimal(2), AM.I))
-                ret.append(DyadicLine("STWA", Decimal(0), AM.S))
+                sym_times = pool.identifier(symbol_table.reference("times"))
+                ret.append(pool.line("CALL", sym_times, AM.I))
+                ret.append(pool.line("ADDSP", pool.decimal(2), AM.I))
+                ret.append(pool.line("STWA", pool.decimal(0), AM.S))
+                depth -= 1
+    if depth > 1:
+        # Drop the temporaries from under the result, which is still in A.
+        ret.append(pool.line("ADDSP", pool.decimal(2 * (depth - 1)), AM.I))
+        ret.append(pool.line("STWA", pool.decimal(0), AM.S))
+    return ret
+
+
+# The stack with its top two values, bottom first in cache, held in A and X
+# rather than in memory. Values move to memory only when a third is pushed,
+# times is called, or a temporary is copied from beneath them, and each moves
+# at most once. The word below the stack pointer is free for scratch.
+class _StackCache:
+    def __init__(self, pool: Flyweights) -> None:
+        self.pool = pool
+        self.lines: List[IRLine] = []
+        self.cache: List[str] = []
+        # Values on the memory stack, counting the slot if there is one.
+        self.depth = 0
+        # Whether the bottom of the cache already has the top word of the
+        # memory stack as its slot, left over from an operand it replaced.
+        # The word is stale until the register is stored to it.
+        self.slotted = False
+
+    def _emit(
+        self,
+        mnemonic: str,
+        operand: int | None = None,
+        mode: AM | None = None,
+    ) -> None:
+        pool = self.pool
+        value = None if operand is None else pool.decimal(operand)
+        self.lines.append(pool.line(mnemonic, value, mode))
+
+    # A register to push into, spilling the bottom of the cache if need be.
+    def _free_register(self) -> str:
+        if len(self.cache) == 2:
+            register = self.cache.pop(0)
+            if self.slotted:
+                self.slotted = False
+            else:
+                self._emit("SUBSP", 2, AM.I)
+                self.depth += 1
+            self._emit(f"STW{register}", 0, AM.S)
+            return register
+        return "X" if self.cache == ["A"] else "A"
+
+    def flush(self) -> None:
+        if not (count := len(self.cache)):
+            return
+        if added := count - self.slotted:
+            self._emit("SUBSP", 2 * added, AM.I)
+        for position, register in enumerate(self.cache):
+            self._emit(f"STW{register}", 2 * (count - 1 - position), AM.S)
+        self.depth += added
+        self.cache.clear()
+        self.slotted = False
+
+    def push(self, value: int) -> None:
+        register = self._free_register()
+        self._emit(f"LDW{register}", value, AM.I)
+        self.cache.append(register)
+
+    def copy(self, temporary: Temporary) -> None:
+        if temporary.index >= self.depth - self.slotted:
+            self.flush()
+        register = self._free_register()
+        offset = 2 * (self.depth - 1 - temporary.index)
+        self._emit(f"LDW{register}", offset, AM.S)
+        self.cache.append(register)
+
+    def add(self, constant: int | None = None) -> None:
+        if constant is not None:
+            self._emit(f"ADD{self.cache[-1]}", constant, AM.I)
+        elif len(self.cache) == 2:
+            # There is no register to register add, so go through memory.
+            self._emit("STWX", -2, AM.S)
+            self._emit("ADDA", -2, AM.S)
+            self.cache = ["A"]
+        elif self.slotted:
+            # The operand is under the slot, which the sum takes over.
+            self._emit(f"ADD{self.cache[0]}", 2, AM.S)
+            self._emit("ADDSP", 2, AM.I)
+            self.depth -= 1
+        else:
+            # The sum takes over the operand's word as its slot.
+            self._emit(f"ADD{self.cache[0]}", 0, AM.S)
+            self.slotted = True
+
+    def multiply(self, multiplier: int) -> None:
+        register = self.cache[-1]
+        if multiplier > 1:
+            self._emit(f"STW{register}", -2, AM.S)
+        self.lines.extend(multiply_ir(self.pool, multiplier, register, -2))
+
+    # times takes both operands from the stack and leaves its product in A,
+    # which takes over the first operand's word as its slot.
+    def call(self, routine: Identifier) -> None:
+        self.flush()
+        self.lines.append(self.pool.line("CALL", routine, AM.I))
+        self._emit("ADDSP", 2, AM.I)
+        self.depth -= 1
+        self.cache = ["A"]
+        self.slotted = True
+
+    # Store the result to the bottom word of the stack and drop the rest.
+    def finish(self) -> List[IRLine]:
+        register = self.cache[-1]
+        if not self.depth:
+            self._emit("SUBSP", 2, AM.I)
+            self.depth = 1
+        self._emit(f"STW{register}", 2 * (self.depth - 1), AM.S)
+        if self.depth > 1:
+            self._emit("ADDSP", 2 * (self.depth - 1), AM.I)
+        return self.lines
+
+
+def _cached_ir(
+    items: List[Item],
+    products: Dict[int, int],
+    skipped: Set[int],
+    symbol_table: SymbolTable,
+    pool: Flyweights,
+) -> List[IRLine]:
+    sums, constants = constant_sums(items)
+    skipped = skipped | constants
+    stack = _StackCache(pool)
+    for index, item in enumerate(items):
+        match type(item):
+            case tokens.Decimal if index in skipped:
+                # Applied by its operation instead.
+                pass
+            case tokens.Decimal:
+                stack.push(cast(tokens.Decimal, item).value)
+            case optimize.Temporary:
+                stack.copy(cast(Temporary, item))
+            case tokens.Plus:
+                stack.add(sums.get(index))
+            case tokens.Times if index in products:
+                stack.multiply(products[index])
+            case tokens.Times:
+                stack.call(pool.identifier(symbol_table.reference("times")))
+    return stack.finish()
+
+
+# With fold, constant subexpressions are computed here rather than by the
+# program; with share, repeated operations are computed once and copied from
+# the stack; with reduce, products with a constant are multiplied inline
+# rather than by times. With cache, the top of the stack is kept in A and X,
+# and sums are added inline rather than by plus. When optimizing, routines
+# the program does not call are left out.
+def to_pep10_ir(
+    expression: List[Token],
+    fold: bool = False,
+    share: bool = False,
+    reduce: bool = False,
+    cache: bool = False,
+) -> Sequence[IRLine]:
+    if fold:
+        expression = fold_constants(expression)
+    items: List[Item] = list(expression)
+    if share:
+        items = share_subexpressions(expression)
+    products, skipped = (
+        constant_products(items, cache) if reduce else ({}, set())
+    )
+    symbol_table = SymbolTable()
+    # Each token expands to the same few lines, so share their templates.
+    pool = Flyweights()
+    generate = _cached_ir if cache else _stacked_ir
+    ret = generate(items, products, skipped, symbol_table, pool)
     ret.append(DyadicLine("LDWA", Decimal(1), AM.I))
     ret.append(DyadicLine("SCALL", Decimal(0), AM.S))
     ret.append(MonadicLine("RET"))
-    ret.extend(plus_ir(symbol_table))
-    ret.extend(times_ir(symbol_table))
+    optimized = fold or share or reduce or cache
+    if not optimized or "plus" in symbol_table:
+        ret.extend(plus_ir(symbol_table))
+    if not optimized or "times" in symbol_table:
+        ret.extend(times_ir(symbol_table))
     return ret
@@ -0,0 +1,209 @@
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Sequence, Set, Tuple, cast
+
+import cs6th_ch7.expr.tokens as tokens
+from .tokens import Token
+
+# Rewrites of a postfix expression, as returned by ExpressionParser.E(), which
+# keep the value the program from code_gen.to_pep10_ir prints. Each works in
+# one pass over the tokens with explicit stacks, so they handle expressions of
+# any depth.
+
+
+# The value at the bottom of the stack, counting from 0, pushed by an earlier
+# part of the expression.
+@dataclass(frozen=True, slots=True)
+class Temporary:
+    index: int
+
+    def postfix_format(self) -> str:
+        return f"t{self.index}"
+
+
+type Item = Token | Temporary
+
+
+# A 16-bit word as signed, as the program's registers hold it.
+def signed(value: int) -> int:
+    value &= 0xFFFF
+    return value - 0x10000 if value & 0x8000 else value
+
+
+# The value plus_ir or times_ir computes, if it returns. times_ir shifts the
+# smaller of its operands, as unsigned words, arithmetically until it is zero,
+# which it never becomes if both are negative. Such products are left for the
+# program to compute.
+def evaluate(operator: Token, left: int, right: int) -> int | None:
+    if type(operator) is tokens.Plus:
+        return signed(left + right)
+    elif signed(left) < 0 and signed(right) < 0:
+        return None
+    return signed(left * right)
+
+
+# Replace each subexpression whose operands are all constants with its value.
+def fold_constants(expression: List[Token]) -> List[Token]:
+    ret: List[Token] = []
+    # For each operand on the stack, its value if it is a constant.
+    values: List[int | None] = []
+    for token in expression:
+        match type(token):
+            case tokens.Decimal:
+                ret.append(token)
+                values.append(cast(tokens.Decimal, token).value)
+            case tokens.Plus | tokens.Times:
+                right, left = values.pop(), values.pop()
+                value = None
+                if left is not None and right is not None:
+                    value = evaluate(token, left, right)
+                if value is None:
+                    ret.append(token)
+                else:
+                    # Constants are single tokens, so they are the last two.
+                    del ret[-2:]
+                    ret.append(tokens.Decimal(value))
+                values.append(value)
+    return ret
+
+
+# Compute each operation which occurs more than once only once. Subexpressions
+# are numbered by value, so repeats share a number; those used more than once
+# are computed first, in the order they complete, and each is left on the
+# stack as a Temporary for later uses to copy. The result is the temporaries'
+# definitions followed by the expression, and leaves one value on the stack
+# per temporary below the expression's value.
+def share_subexpressions(expression: List[Token]) -> List[Item]:
+    numbers: Dict[object, int] = {}
+    # Per number: its token, its operands' numbers, and how many operations
+    # use it. Operands of a constant are -1.
+    nodes: List[Token] = []
+    operands: List[Tuple[int, int]] = []
+    uses: List[int] = []
+    stack: List[int] = []
+    for token in expression:
+        match type(token):
+            case tokens.Decimal:
+                key: object = cast(tokens.Decimal, token).value
+                children = (-1, -1)
+            case tokens.Plus | tokens.Times:
+                right, left = stack.pop(), stack.pop()
+                key, children = (type(token), left, right), (left, right)
+            case _:
+                continue
+        if (number := numbers.get(key)) is None:
+            number = numbers[key] = len(nodes)
+            nodes.append(token)
+            operands.append(children)
+            uses.append(0)
+            # A repeat reuses these uses rather than adding its own.
+            for child in children:
+                if child >= 0:
+                    uses[child] += 1
+        stack.append(number)
+    if not stack:
+        return []
+
+    # Copying a constant costs as much as pushing it, so only share operations.
+    temporaries: Dict[int, int] = {}
+    for number, count in enumerate(uses):
+        if count > 1 and operands[number][0] >= 0:
+            temporaries[number] = len(temporaries)
+
+    def postfix(root: int) -> List[Item]:
+        ret: List[Item] = []
+        pending = [(root, False)]
+        while pending:
+            number, expanded = pending.pop()
+            if number != root and number in temporaries:
+                ret.append(Temporary(temporaries[number]))
+            elif expanded or operands[number][0] < 0:
+                ret.append(nodes[number])
+            else:
+                left, right = operands[number]
+                pending += [(number, True), (right, False), (left, False)]
+        return ret
+
+    ret: List[Item] = []
+    for number in temporaries:
+        ret.extend(postfix(number))
+    ret.extend(postfix(stack[-1]))
+    return ret
+
+
+# Operations of one type with a constant operand, which code_gen applies
+# inline rather than pushing it. Returns the constant, as a signed word, for
+# the index of each such operation allowed by accept, and the indices of the
+# Decimals which need not be pushed.
+def _constant_operands(
+    expression: Sequence[Item],
+    operator: type,
+    accept: Callable[[int], bool],
+) -> Tuple[Dict[int, int], Set[int]]:
+    constants: Dict[int, int] = {}
+    skipped: Set[int] = set()
+    # For each operand on the stack, its index if it is a constant.
+    stack: List[int | None] = []
+    for index, item in enumerate(expression):
+        match type(item):
+            case tokens.Decimal:
+                stack.append(index)
+                continue
+            case tokens.Plus | tokens.Times:
+                right, left = stack.pop(), stack.pop()
+            case _:
+                # A Temporary, whose value is only known to the program.
+                stack.append(None)
+                continue
+        stack.append(None)
+        if type(item) is not operator:
+            continue
+        # Prefer the right operand, which times_ir would loop over.
+        for operand in (right, left):
+            if operand is None:
+                continue
+            token = cast(tokens.Decimal, expression[operand])
+            if accept(value := signed(token.value)):
+                constants[index] = value
+                skipped.add(operand)
+                break
+    return constants, skipped
+
+
+# times_ir always returns when either operand is non-negative, so multiplying
+# by such a constant inline gives the same product. Only constants whose
+# inline product is no larger and no slower than calling times are included,
+# which is cheaper when the stack is cached.
+def constant_products(
+    expression: Sequence[Item],
+    cache: bool = False,
+) -> Tuple[Dict[int, int], Set[int]]:
+    accept = _is_cheap_cached_multiplier if cache else _is_cheap_multiplier
+    return _constant_operands(expression, tokens.Times, accept)
+
+
+def constant_sums(
+    expression: Sequence[Item],
+) -> Tuple[Dict[int, int], Set[int]]:
+    return _constant_operands(expression, tokens.Plus, _is_any)
+
+
+# Multiplying inline takes a one-byte shift per bit after the leading one and
+# a three-byte add per set bit after it, plus a three-byte store. Calling times
+# takes 18 bytes at the call site, pushing the constant included, and at least
+# 17 instructions even if its loop never runs. Inline is then no larger, and
+# no slower, when bit_length + 3 * set bits <= 19.
+def _is_cheap_multiplier(value: int) -> bool:
+    return value >= 0 and value.bit_length() + 3 * value.bit_count() <= 19
+
+
+# With the stack cached, times' operands are stored under one SUBSP and its
+# product takes over the first one's word, so a call takes 18 bytes and the
+# product 3 more to store. Inline, the product is left in a register, which
+# takes 6 bytes to store. Inline is then no larger when bit_length + 3 * set
+# bits <= 16, and much faster.
+def _is_cheap_cached_multiplier(value: int) -> bool:
+    return value >= 0 and value.bit_length() + 3 * value.bit_count() <= 16
+
+
+def _is_any(value: int) -> bool:
+    return True
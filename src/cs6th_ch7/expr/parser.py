@@ -1,14 +1,16 @@
 import io
-from typing import cast, List
+from typing import Callable, cast, List
 import cs6th_ch7.expr.tokens as tokens
 from .tokens import Token
-from cs6th_ch7.utils.buffer import ParserBuffer
+from cs6th_ch7.utils.buffer import ParserBuffer, TokenProducer
 from .lexer import Lexer
 
+type LexerType = Callable[[io.StringIO], TokenProducer[Token]]
+
 
 class ExpressionParser:
-    def __init__(self, buffer: io.StringIO):
-        self._lexer = Lexer(buffer)
+    def __init__(self, buffer: io.StringIO, lexer_type: LexerType = Lexer):
+        self._lexer = lexer_type(buffer)
         self._buffer = ParserBuffer(self._lexer)
 
     # 3. <F> -> ( <E> )
@@ -35,3 +37,42 @@ class ExpressionParser:
             e = self.E()
             return [*t, *e, plus]
         return t
+
+
+# ExpressionParser.E() without recursion, by shunting-yard. It reads tokens in
+# the same order as the recursive rules, so it produces the same postfix list
+# and raises SyntaxError at the same token, but in O(n) time and with a call
+# stack of constant depth however long or deeply nested the expression. Both
+# operators are right associative, so an operator only pops those of strictly
+# higher precedence.
+class IterativeExpressionParser(ExpressionParser):
+    def E(self) -> list[Token]:
+        ret: list[Token] = []
+        # Pending operators, and a ParenOpen for each unclosed parenthesis.
+        operators: list[Token] = []
+        depth = 0
+        while True:
+            # <F>: any number of ( before the DEC.
+            while paren := self._buffer.may_match(tokens.ParenOpen):
+                operators.append(paren)
+                depth += 1
+            ret.append(self._buffer.must_match(tokens.Decimal))
+
+            # After an <F>, try [* <T>], then [+ <E>], then the ) closing the
+            # innermost <F> -> ( <E> ), in the order the recursive rules would.
+            while True:
+                if times := self._buffer.may_match(tokens.Times):
+                    operators.append(times)
+                    break
+                elif plus := self._buffer.may_match(tokens.Plus):
+                    while operators and type(operators[-1]) is tokens.Times:
+                        ret.append(operators.pop())
+                    operators.append(plus)
+                    break
+                elif depth == 0:
+                    ret.extend(reversed(operators))
+                    return ret
+                self._buffer.must_match(tokens.ParenClose)
+                while type(top := operators.pop()) is not tokens.ParenOpen:
+                    ret.append(top)
+                depth -= 1
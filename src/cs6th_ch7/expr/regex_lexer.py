@@ -0,0 +1,61 @@
+import io
+import re
+from typing import Dict, Iterator, List
+
+import cs6th_ch7.expr.tokens as tokens
+from .tokens import Token
+from .lexer import Lexer
+from cs6th_ch7.utils.buffer import TokenProducer
+
+# Each match is one of Lexer's tokens, less leading whitespace: "\n", a
+# punctuator, a decimal, or an invalid character. A "-" not followed by a digit
+# consumes the next character, even "\n". Whitespace is never Invalid on its
+# own, so a run of it at the end of the buffer falls through to the empty
+# match, which Lexer reports as Empty.
+TOKEN_PATTERN = re.compile(
+    r"[^\S\n]*(\n|[()+*]|-?[0-9]+|-[\s\S]?|\S)|[^\S\n]+\Z"
+)
+
+
+def _classify(lexeme: str) -> Token:
+    # Only a decimal can end in a digit.
+    if lexeme[-1:].isdigit():
+        return tokens.Decimal(int(lexeme))
+    return tokens.INVALID
+
+
+# Produces the same tokens as Lexer, from one findall() over the rest of the
+# buffer. Equal lexemes share one token, so tokens must not be modified. Text
+# with non-ASCII characters is left to Lexer, whose str.isdecimal() accepts
+# digits that [0-9] does not.
+class RegexLexer(TokenProducer[Token]):
+    def __init__(self, buffer: io.StringIO) -> None:
+        self.buffer: io.StringIO = buffer
+        self._tokens: Iterator[Token] | None = None
+
+    # Hands out the underlying iterator, so loops over the lexer avoid a
+    # Python-level __next__ per token.
+    def __iter__(self) -> Iterator[Token]:
+        if self._tokens is None:
+            self._tokens = self._scan(self.buffer.read())
+        return self._tokens
+
+    def __next__(self) -> Token:
+        return next(self._tokens or iter(self))
+
+    @staticmethod
+    def _scan(text: str) -> Iterator[Token]:
+        if not text.isascii():
+            return Lexer(io.StringIO(text))
+        lexemes: List[str] = TOKEN_PATTERN.findall(text)
+        known: Dict[str, Token] = {
+            "": tokens.EMPTY,
+            "\n": tokens.EMPTY,
+            "(": tokens.PAREN_OPEN,
+            ")": tokens.PAREN_CLOSE,
+            "+": tokens.PLUS,
+            "*": tokens.TIMES,
+        }
+        for lexeme in set(lexemes).difference(known):
+            known[lexeme] = _classify(lexeme)
+        return iter(list(map(known.__getitem__, lexemes)))
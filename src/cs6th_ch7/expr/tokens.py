@@ -1,43 +1,43 @@
 from dataclasses import dataclass
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Empty:
     def postfix_format(self) -> str:
         return ""
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Invalid:
     def postfix_format(self) -> str:
         return ""
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Plus:
     def postfix_format(self) -> str:
         return "+"
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Times:
     def postfix_format(self) -> str:
         return "*"
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ParenOpen:
     def postfix_format(self) -> str:
         return ""
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ParenClose:
     def postfix_format(self) -> str:
         return ""
 
 
-@dataclass
+@dataclass(slots=True)
 class Decimal:
     value: int
 
@@ -46,3 +46,7 @@ class Decimal:
 
 
 type Token = Empty | Invalid | Decimal | Plus | Times | ParenOpen | ParenClose
+
+# Valueless tokens carry no state, so one shared instance of each suffices.
+EMPTY, INVALID, PLUS, TIMES = Empty(), Invalid(), Plus(), Times()
+PAREN_OPEN, PAREN_CLOSE = ParenOpen(), ParenClose()
@@ -1,3 +1,4 @@
 from .table import Table
 from .direct import Direct
 from .hex_direct import HexDirect
+from .dfa import DenseDFA, compile_dfa
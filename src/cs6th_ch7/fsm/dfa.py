@@ -0,0 +1,48 @@
+import array
+from dataclasses import dataclass
+from enum import IntEnum
+from typing import Callable, Dict
+
+
+@dataclass(frozen=True)
+class DenseDFA:
+    # ASCII code point -> character class.
+    classes: bytes
+    # Flat (state row + character class) -> next state row. Rows are
+    # pre-multiplied by stride, so the scan loop never multiplies.
+    transitions: array.array
+    stride: int
+    start: int
+    # Rows at or above this offset belong to final states.
+    first_final: int
+    # Indexed by state: the character which entered the final state is not
+    # part of the token and must be read again.
+    pushback: bytes
+
+
+# Densify a table in the style of fsm.Table into arrays indexed by ASCII
+# character class. Transitions missing from the table go to `default`.
+# Final states stop the scan, and must be numbered after every other state.
+def compile_dfa[S: IntEnum, K: IntEnum](
+    states: type[S],
+    kinds: type[K],
+    classify: Callable[[str], K],
+    transitions: Dict[S, Dict[K, S]],
+    start: S,
+    default: S,
+    final: Dict[S, bool],
+) -> DenseDFA:
+    first_final = min(final)
+    if any(state >= first_final for state in states if state not in final):
+        raise ValueError("Final states must be numbered after all others")
+
+    stride = len(kinds)
+    classes = bytes(classify(chr(ch)) for ch in range(128))
+    table = array.array("H", [default * stride] * (len(states) * stride))
+    for state, row in transitions.items():
+        for kind, target in row.items():
+            table[state * stride + kind] = target * stride
+    pushback = bytes(final.get(state, False) for state in states)
+    return DenseDFA(
+        classes, table, stride, start * stride, first_final * stride, pushback
+    )
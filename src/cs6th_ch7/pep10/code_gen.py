@@ -1,14 +1,21 @@
 import itertools
-from typing import List, Tuple, cast, Sequence
+from typing import Iterable, Iterator, List, TextIO, Tuple, cast, Sequence
 
 from .operands import Identifier, OperandType
-from .ir import GeneratesObjectCode, listing, ErrorLine, IRLine
+from .ir import DyadicLine, GeneratesObjectCode, listing, ErrorLine, IRLine
+from .flyweight import PlacedLine
 from .symbol import SymbolEntry
+from .compact import CompactProgram, LineKind, NONE, OperandKind
+from . import vectorized
 
 
 def calculate_addresses(
-    parse_tree: Sequence[IRLine], base_address=0
-) -> Tuple[List[IRLine], List[str]]:
+    parse_tree: Sequence[IRLine] | CompactProgram, base_address=0
+) -> Tuple[List[IRLine] | CompactProgram, List[str]]:
+    if isinstance(parse_tree, CompactProgram) and vectorized.available():
+        return vectorized.compact_addresses(parse_tree, base_address)
+    elif isinstance(parse_tree, CompactProgram):
+        return compact_addresses(parse_tree, base_address)
     errors: List[str] = []
     ir: List[IRLine] = []
     memory_address = base_address
@@ -35,7 +42,7 @@ def calculate_addresses(
                 symbol.value = memory_address
 
         # Check that symbols used as arguments are not undefined.
-        if maybe_argument := getattr(line, "argument", None):
+        if maybe_argument := getattr(line, "operand_spec", None):
             argument: OperandType = maybe_argument
             if type(argument) is Identifier and argument.symbol.is_undefined():
                 errors.append(f"Undefined symbol: {argument.symbol}")
@@ -44,7 +51,55 @@ def calculate_addresses(
     return ir, errors
 
 
-def program_object_code(program: List[IRLine]) -> bytearray:
+# calculate_addresses for a CompactProgram, reporting errors in the same order.
+def compact_addresses(
+    program: CompactProgram, base_address=0
+) -> Tuple[CompactProgram, List[str]]:
+    errors: List[str] = []
+    error_lines = 0
+    memory_address = base_address
+    symbols, decls, lengths = (
+        program.symbols,
+        program.symbol_decls,
+        program.lengths,
+    )
+    operand_kinds, operands = program.operand_kinds, program.operands
+    for index, kind in enumerate(program.kinds):
+        if kind == LineKind.ERROR:
+            errors.append(program.source(index))
+            error_lines += 1
+            continue
+        elif kind < LineKind.MONADIC:
+            continue
+
+        program.addresses[index] = memory_address
+        if decls[index] != NONE:
+            symbol = symbols[decls[index]]
+            if symbol.is_multiply_defined():
+                errors.append(f"Multiply defined symbol: {symbol}")
+            else:
+                symbol.value = memory_address
+
+        if operand_kinds[index] == OperandKind.IDENTIFIER:
+            if (argument := symbols[operands[index]]).is_undefined():
+                errors.append(f"Undefined symbol: {argument}")
+        memory_address += lengths[index]
+
+    if error_lines:
+        kinds = program.kinds
+        program = program.select(
+            index for index, kind in enumerate(kinds) if kind != LineKind.ERROR
+        )
+    return program, errors
+
+
+def program_object_code(program: List[IRLine] | CompactProgram) -> bytearray:
+    if isinstance(program, CompactProgram):
+        return bytearray(
+            itertools.chain.from_iterable(
+                program.object_code(index) for index in range(len(program))
+            )
+        )
     oc = itertools.chain.from_iterable(
         (
             line.object_code()
@@ -55,10 +110,97 @@ def program_object_code(program: List[IRLine]) -> bytearray:
     return bytearray(oc)
 
 
-def program_source(program: List[IRLine]) -> List[str]:
+def program_source(program: List[IRLine] | CompactProgram) -> List[str]:
+    if isinstance(program, CompactProgram):
+        return [program.source(index) for index in range(len(program))]
     return [line.source() for line in program]
 
 
-def program_listing(program: List[IRLine]) -> List[str]:
+def program_listing(program: List[IRLine] | CompactProgram) -> List[str]:
+    if isinstance(program, CompactProgram):
+        lines = (program.listing(index) for index in range(len(program)))
+        return list(itertools.chain.from_iterable(lines))
     lst = itertools.chain.from_iterable(listing(line) for line in program)
     return list(lst)
+
+
+# Bytes of object code in an addressed program, from its first and last
+# instructions. Falls back to summing lengths if addresses are missing.
+def _code_size(program: Sequence[IRLine]) -> int:
+    first = next(_code_lines(program), None)
+    last = next(_code_lines(reversed(program)), None)
+    if first is None or last is None:
+        return 0
+    elif first.memory_address is None or last.memory_address is None:
+        return sum(len(line) for line in _code_lines(program))
+    return last.memory_address + len(last) - first.memory_address
+
+
+def _code_lines(lines: Iterable[IRLine]) -> Iterator[GeneratesObjectCode]:
+    return (line for line in lines if isinstance(line, GeneratesObjectCode))
+
+
+# program_object_code, program_listing and program_source in one walk over the
+# IR. Object code is written into a single buffer sized from the addresses,
+# and each line's source is rendered once and streamed to the writers given.
+def emit_program(
+    program: Sequence[IRLine] | CompactProgram,
+    listing_out: TextIO | None = None,
+    source_out: TextIO | None = None,
+) -> bytearray:
+    if isinstance(program, CompactProgram):
+        return _emit_compact(program, listing_out, source_out)
+
+    buffer = bytearray(_code_size(program))
+    pos = 0
+    for line in program:
+        text = line.source()
+        if source_out is not None:
+            source_out.write(text + "\n")
+
+        dyadic = line.template if type(line) is PlacedLine else line
+        if type(dyadic) is DyadicLine:
+            # Usually cached, for lines already encoded by an earlier pass.
+            buffer[pos : pos + 3] = dyadic.object_code()
+            length = 3
+        elif isinstance(line, GeneratesObjectCode):
+            code = line.object_code()
+            length = len(code)
+            buffer[pos : pos + length] = code
+            if length > 3 and listing_out is not None:
+                # Continuation rows, as laid out by ir.listing.
+                listing_out.writelines(row + "\n" for row in listing(line))
+                pos += length
+                continue
+        else:
+            if listing_out is not None:
+                listing_out.write(f"{'':4} {'':6} {text}\n")
+            continue
+
+        if listing_out is not None:
+            address = getattr(line, "memory_address", None)
+            address_str = f"{address:04X}" if address is not None else 4 * " "
+            code_str = buffer[pos : pos + length].hex().upper()
+            listing_out.write(f"{address_str} {code_str:6} {text}\n")
+        pos += length
+    # Only differs from the estimate if addresses were stale.
+    del buffer[pos:]
+    return buffer
+
+
+def _emit_compact(
+    program: CompactProgram,
+    listing_out: TextIO | None = None,
+    source_out: TextIO | None = None,
+) -> bytearray:
+    buffer = bytearray(sum(program.lengths))
+    pos = 0
+    for index in range(len(program)):
+        code = program.object_code(index)
+        buffer[pos : pos + len(code)] = code
+        pos += len(code)
+        if source_out is not None:
+            source_out.write(program.source(index) + "\n")
+        if listing_out is not None:
+            listing_out.writelines(row + "\n" for row in program.listing(index))
+    return buffer
@@ -0,0 +1,197 @@
+import array
+import io
+from enum import IntEnum
+from sys import intern
+from typing import Dict, List, Set
+
+import cs6th_ch7.pep10.tokens as tokens
+from .tokens import Token
+from .lexer import Lexer
+from .regex_lexer import TOKEN_PATTERN
+
+
+class Kind(IntEnum):
+    EMPTY, INVALID, COMMA, DECIMAL, HEXADECIMAL = range(0, 5)
+    COMMENT, IDENTIFIER, SYMBOL = range(5, 8)
+
+
+TOKEN_TYPES = (
+    tokens.Empty,
+    tokens.Invalid,
+    tokens.Comma,
+    tokens.Decimal,
+    tokens.Hexadecimal,
+    tokens.Comment,
+    tokens.Identifier,
+    tokens.Symbol,
+)
+KINDS: Dict[type, Kind] = {ty: Kind(i) for i, ty in enumerate(TOKEN_TYPES)}
+
+_GROUP_KINDS: Dict[str | None, int] = {
+    "empty": Kind.EMPTY,
+    "eof": Kind.EMPTY,
+    "comma": Kind.COMMA,
+    "comment": Kind.COMMENT,
+    "ident": Kind.IDENTIFIER,
+    "symbol": Kind.SYMBOL,
+    "hex": Kind.HEXADECIMAL,
+    "dec": Kind.DECIMAL,
+    "bad_hex": Kind.INVALID,
+    "invalid": Kind.INVALID,
+}
+# Regex group holding the token's value, if not the whole match.
+_VALUE_GROUPS: Dict[str | None, str] = {
+    "comment": "comment",
+    "ident": "ident",
+    "symbol": "ident",
+    "hex": "hex",
+    "dec": "dec",
+}
+
+
+# A whole buffer's tokens as parallel arrays. Token i spans
+# source[starts[i]:ends[i]], where the span covers only the token's value
+# (e.g., a comment excludes its ";"). Numeric values live in `values`.
+class TokenColumns:
+    def __init__(self, source: str) -> None:
+        self.source = source
+        self.kinds = array.array("B")
+        self.starts = array.array("I")
+        self.ends = array.array("I")
+        self.values = array.array("q")
+        # Tokens which are not a plain slice of source: those lexed from
+        # non-ASCII lines, and numbers too large for `values`.
+        self.overrides: Dict[int, Token] = {}
+
+    def __len__(self) -> int:
+        return len(self.kinds)
+
+    def text(self, index: int) -> str:
+        return self.source[self.starts[index] : self.ends[index]]
+
+    def token(self, index: int) -> Token:
+        if self.overrides and index in self.overrides:
+            return self.overrides[index]
+        match self.kinds[index]:
+            case Kind.IDENTIFIER:
+                return tokens.Identifier(intern(self.text(index)))
+            case Kind.COMMA:
+                return tokens.COMMA
+            case Kind.EMPTY:
+                return tokens.EMPTY
+            case Kind.DECIMAL:
+                return tokens.Decimal(self.values[index])
+            case Kind.SYMBOL:
+                return tokens.Symbol(intern(self.text(index)))
+            case Kind.COMMENT:
+                return tokens.Comment(self.text(index))
+            case Kind.HEXADECIMAL:
+                return tokens.Hexadecimal(self.values[index])
+        return tokens.INVALID
+
+    def _append(self, kind: Kind, start: int, end: int, value: int = 0):
+        self.kinds.append(kind)
+        self.starts.append(start)
+        self.ends.append(end)
+        self.values.append(value)
+
+    def _append_override(self, token: Token, start: int, end: int):
+        self.overrides[len(self.kinds)] = token
+        self._append(KINDS[type(token)], start, end)
+
+    def _scan(self, pos: int, stop: int):
+        kinds, starts, ends = self.kinds, self.starts, self.ends
+        values = self.values
+        for match in TOKEN_PATTERN.finditer(self.source, pos, stop):
+            group = match.lastgroup
+            kind, value = _GROUP_KINDS[group], 0
+            if group == "hex" or group == "dec":
+                value = int(match[group], 16 if group == "hex" else 10)
+                if not -(2**63) <= value < 2**63:
+                    token = (
+                        tokens.Hexadecimal(value)
+                        if group == "hex"
+                        else tokens.Decimal(value)
+                    )
+                    self._append_override(token, *match.span(group))
+                    continue
+            start, end = match.span(_VALUE_GROUPS.get(group, 0))
+            kinds.append(kind)
+            starts.append(start)
+            ends.append(end)
+            values.append(value)
+
+
+# Tokenize all of text as Lexer(io.StringIO(text)) would, without allocating
+# a token object per token. As in LineLexer, non-ASCII lines defer to Lexer.
+def tokenize_columns(text: str) -> TokenColumns:
+    columns = TokenColumns(text)
+    if text.isascii():
+        columns._scan(0, len(text))
+        return columns
+
+    pos = 0
+    while pos < len(text):
+        stop = text.find("\n", pos) + 1 or len(text)
+        if (line := text[pos:stop]).isascii():
+            columns._scan(pos, stop)
+        else:
+            for token in Lexer(io.StringIO(line)):
+                columns._append_override(token, pos, stop)
+        pos = stop
+    return columns
+
+
+# ParserBuffer over a TokenColumns. Kinds are compared as small ints, and a
+# token object is only built for a successful match.
+class ColumnBuffer:
+    def __init__(self, columns: TokenColumns):
+        self._columns = columns
+        self._kinds = columns.kinds
+        self._index = 0
+        self._marks: List[int] = []
+
+    def peek(self, k: int = 0):
+        if self._index + k >= len(self._kinds):
+            return None
+        return self._columns.token(self._index + k)
+
+    def may_match(self, expected_type):
+        index = self._index
+        if (
+            index < len(self._kinds)
+            and self._kinds[index] == KINDS[expected_type]
+        ):
+            self._index = index + 1
+            return self._columns.token(index)
+        return None
+
+    def advance(self):
+        self._index += 1
+
+    def must_match(self, expected_type):
+        if ret := self.may_match(expected_type):
+            return ret
+        raise SyntaxError()
+
+    def mark(self):
+        self._marks.append(self._index)
+
+    def reset(self):
+        self._index = self._marks.pop()
+
+    def release(self):
+        self._marks.pop()
+
+    def skip_to_next_line[T](self, eol_markers: Set[type[T]]):
+        markers = {KINDS[marker] for marker in eol_markers}
+        kinds, index = self._kinds, self._index
+        if len(markers) == 1:
+            try:
+                index = kinds.index(next(iter(markers)), index)
+            except ValueError:
+                index = len(kinds)
+        while index < len(kinds) and kinds[index] not in markers:
+            index += 1
+        # Consume trailing EOL, so we can begin parsing on the next line
+        self._index = min(index + 1, len(kinds))
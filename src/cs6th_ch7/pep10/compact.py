@@ -0,0 +1,199 @@
+import array
+from enum import IntEnum
+from typing import Dict, Iterable, Iterator, List, Tuple, cast
+
+from .ir import CommentLine, DyadicLine, EmptyLine, ErrorLine, IRLine
+from .ir import MonadicLine, source
+from .mnemonics import AddressingMode, MNEMONICS, MNEMONIC_IDS, MODE_COUNT
+from .mnemonics import OPCODES, as_int
+from .operands import Decimal, Hexadecimal, Identifier, OperandType
+from .symbol import SymbolEntry
+
+
+class LineKind(IntEnum):
+    EMPTY, COMMENT, ERROR, MONADIC, DYADIC = range(0, 5)
+
+
+class OperandKind(IntEnum):
+    NONE, DECIMAL, HEXADECIMAL, IDENTIFIER = range(0, 4)
+
+
+# Marks a missing mode, symbol declaration, or memory address.
+NONE = -1
+_MODES = list(AddressingMode)
+
+
+# A program as parallel arrays with one row per line, at a few dozen bytes a
+# line rather than an object graph per line. Instructions store a mnemonic id
+# and AddressingMode value; operands are a value, or an index into `symbols`
+# for identifiers. Comments and error messages live in a side table, and
+# source text is rebuilt on demand. Lines can be appended one at a time, e.g.
+# straight from a Parser, so the object form of the whole program never
+# exists at once.
+class CompactProgram:
+    def __init__(self, lines: Iterable[IRLine] = ()) -> None:
+        self.kinds = array.array("B")
+        self.mnemonics = array.array("B")
+        self.modes = array.array("b")
+        self.operand_kinds = array.array("B")
+        self.operands = array.array("i")
+        self.symbol_decls = array.array("i")
+        self.lengths = array.array("B")
+        self.addresses = array.array("i")
+        # Side table of comments and error messages, one entry per row.
+        self.comments: List[str | None] = []
+        self.symbols: List[SymbolEntry] = []
+        self._symbol_ids: Dict[SymbolEntry, int] = {}
+        for line in lines:
+            self.append(line)
+
+    def __len__(self) -> int:
+        return len(self.kinds)
+
+    def __getitem__(self, index: int) -> IRLine:
+        comment = self.comments[index]
+        match self.kinds[index]:
+            case LineKind.EMPTY:
+                return EmptyLine()
+            case LineKind.COMMENT:
+                # Comment rows always come from a CommentLine's text.
+                return CommentLine(cast(str, comment))
+            case LineKind.ERROR:
+                return ErrorLine(comment)
+        mnemonic, symbol = self._mnemonic(index), self._symbol_decl(index)
+        address = self.addresses[index] if self.addresses[index] >= 0 else None
+        if self.kinds[index] == LineKind.MONADIC:
+            return MonadicLine(mnemonic, symbol, comment, address)
+        operand, mode = self._operand(index), _MODES[self.modes[index]]
+        return DyadicLine(mnemonic, operand, mode, symbol, comment, address)
+
+    def __iter__(self) -> Iterator[IRLine]:
+        return (self[index] for index in range(len(self)))
+
+    def symbol_id(self, symbol: SymbolEntry) -> int:
+        if (ret := self._symbol_ids.get(symbol)) is None:
+            ret = self._symbol_ids[symbol] = len(self.symbols)
+            self.symbols.append(symbol)
+        return ret
+
+    def append(self, line: IRLine) -> None:
+        mnemonic, mode, operand_kind, operand = 0, NONE, OperandKind.NONE, 0
+        symbol, length = None, 0
+        match line:
+            case DyadicLine():
+                kind, mnemonic = LineKind.DYADIC, MNEMONIC_IDS[line.mnemonic]
+                mode = line.addressing_mode.value
+                operand_kind, operand = self._encode_operand(line.operand_spec)
+                symbol, length = line.symbol_decl, 3
+            case MonadicLine():
+                kind, mnemonic = LineKind.MONADIC, MNEMONIC_IDS[line.mnemonic]
+                symbol, length = line.symbol_decl, 1
+            case CommentLine():
+                kind = LineKind.COMMENT
+            case ErrorLine():
+                kind = LineKind.ERROR
+            case EmptyLine():
+                kind = LineKind.EMPTY
+            case _:
+                raise TypeError(f"Unsupported line: {line!r}")
+
+        self.comments.append(getattr(line, "comment", None))
+        self.kinds.append(kind)
+        self.mnemonics.append(mnemonic)
+        self.modes.append(mode)
+        self.operand_kinds.append(operand_kind)
+        self.operands.append(operand)
+        self.symbol_decls.append(
+            NONE if symbol is None else self.symbol_id(symbol)
+        )
+        self.lengths.append(length)
+        address = getattr(line, "memory_address", None)
+        self.addresses.append(NONE if address is None else address)
+
+    # Copy of the given rows, sharing this program's symbols.
+    def select(self, indices: Iterable[int]) -> "CompactProgram":
+        ret = CompactProgram()
+        ret.symbols, ret._symbol_ids = self.symbols, self._symbol_ids
+        columns = [
+            (ret.kinds, self.kinds),
+            (ret.mnemonics, self.mnemonics),
+            (ret.modes, self.modes),
+            (ret.operand_kinds, self.operand_kinds),
+            (ret.operands, self.operands),
+            (ret.symbol_decls, self.symbol_decls),
+            (ret.lengths, self.lengths),
+            (ret.addresses, self.addresses),
+        ]
+        for index in indices:
+            ret.comments.append(self.comments[index])
+            for target, column in columns:
+                target.append(column[index])
+        return ret
+
+    def operand_value(self, index: int) -> int:
+        if self.operand_kinds[index] == OperandKind.IDENTIFIER:
+            return int(self.symbols[self.operands[index]])
+        return self.operands[index]
+
+    def source(self, index: int) -> str:
+        comment = self.comments[index]
+        match self.kinds[index]:
+            case LineKind.EMPTY:
+                return source("", [], None, None)
+            case LineKind.COMMENT:
+                return source("", [], None, comment)
+            case LineKind.ERROR:
+                return ErrorLine(comment).source()
+        args: List[str] = []
+        if self.kinds[index] == LineKind.DYADIC:
+            mode = _MODES[self.modes[index]].name.lower()
+            args = [str(self._operand(index)), mode]
+        symbol = self._symbol_decl(index)
+        return source(self._mnemonic(index), args, symbol, comment)
+
+    def object_code(self, index: int) -> bytearray:
+        if (kind := self.kinds[index]) < LineKind.MONADIC:
+            return bytearray()
+        mode = self.modes[index] if kind == LineKind.DYADIC else 0
+        row = self.mnemonics[index] * MODE_COUNT
+        if (bits := OPCODES[row + mode]) < 0:
+            # Raises the TypeError explaining why there is no encoding.
+            bits = as_int(self._mnemonic(index), _MODES[mode])
+        if kind == LineKind.MONADIC:
+            return bytearray((bits,))
+        # Negative operands are stored in two's complement, as parsed.
+        operand = self.operand_value(index)
+        return bytearray((bits, *operand.to_bytes(2, signed=operand < 0)))
+
+    def listing(self, index: int) -> List[str]:
+        address_str, code = 4 * " ", self.object_code(index)
+        if self.kinds[index] >= LineKind.MONADIC and self.addresses[index] >= 0:
+            address_str = f"{self.addresses[index]:04X}"
+        code_str = "".join(f"{i:02X}" for i in code)
+        return [f"{address_str} {code_str:6} {self.source(index)}"]
+
+    def _mnemonic(self, index: int) -> str:
+        return MNEMONICS[self.mnemonics[index]]
+
+    def _symbol_decl(self, index: int) -> SymbolEntry | None:
+        symbol_id = self.symbol_decls[index]
+        return None if symbol_id == NONE else self.symbols[symbol_id]
+
+    def _operand(self, index: int) -> OperandType:
+        value = self.operands[index]
+        match self.operand_kinds[index]:
+            case OperandKind.DECIMAL:
+                return Decimal(value)
+            case OperandKind.HEXADECIMAL:
+                return Hexadecimal(value)
+        return Identifier(self.symbols[value])
+
+    def _encode_operand(self, operand: OperandType) -> Tuple[OperandKind, int]:
+        match operand:
+            case Decimal():
+                return OperandKind.DECIMAL, operand.value
+            case Hexadecimal():
+                return OperandKind.HEXADECIMAL, operand.value
+            case Identifier():
+                return OperandKind.IDENTIFIER, self.symbol_id(operand.symbol)
+        raise TypeError(f"Unsupported operand: {operand}")
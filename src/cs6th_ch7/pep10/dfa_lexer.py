@@ -0,0 +1,142 @@
+from enum import IntEnum
+from sys import intern
+from typing import Dict, List
+
+import cs6th_ch7.pep10.tokens as tokens
+from .tokens import Token
+from .lexer import LineLexer
+from ..fsm.dfa import compile_dfa
+
+
+class States(IntEnum):
+    START, COMMENT, IDENT, LEADING0, HEX_PRE, HEX, SIGN, DEC = range(0, 8)
+    # Final states, one per way Lexer can stop.
+    EMPTY, COMMA, COMMENT_END, IDENT_END, SYMBOL = range(8, 13)
+    ZERO, HEX_END, DEC_END, INVALID = range(13, 17)
+
+
+class Kind(IntEnum):
+    Newline, Space, Comma, Semicolon, Colon, Sign = range(0, 6)
+    Zero, Digit, HexLetter, X, Letter, Underscore, Other = range(6, 13)
+
+
+def classify(ch: str) -> Kind:
+    if ch == "\n":
+        return Kind.Newline
+    elif ch.isspace():
+        return Kind.Space
+    elif ch in "xX":
+        return Kind.X
+    elif ch in "abcdefABCDEF":
+        return Kind.HexLetter
+    elif ch.isalpha():
+        return Kind.Letter
+    elif ch == "0":
+        return Kind.Zero
+    elif ch.isdigit():
+        return Kind.Digit
+    return {
+        ",": Kind.Comma,
+        ";": Kind.Semicolon,
+        ":": Kind.Colon,
+        "+": Kind.Sign,
+        "-": Kind.Sign,
+        "_": Kind.Underscore,
+    }.get(ch, Kind.Other)
+
+
+_IDENT = [Kind.Zero, Kind.Digit, Kind.HexLetter, Kind.X, Kind.Letter]
+_DIGITS = [Kind.Zero, Kind.Digit]
+_HEX_DIGITS = [Kind.Zero, Kind.Digit, Kind.HexLetter]
+
+
+def _all(state: States) -> Dict[Kind, States]:
+    return {kind: state for kind in Kind}
+
+
+def _each(kinds: List[Kind], state: States) -> Dict[Kind, States]:
+    return {kind: state for kind in kinds}
+
+
+transitions: Dict[States, Dict[Kind, States]] = {
+    States.START: {
+        Kind.Newline: States.EMPTY,
+        Kind.Space: States.START,
+        Kind.Comma: States.COMMA,
+        Kind.Semicolon: States.COMMENT,
+        Kind.Zero: States.LEADING0,
+        Kind.Digit: States.DEC,
+        Kind.Sign: States.SIGN,
+        **_each([Kind.HexLetter, Kind.X, Kind.Letter], States.IDENT),
+    },
+    States.COMMENT: _all(States.COMMENT) | {Kind.Newline: States.COMMENT_END},
+    States.IDENT: _all(States.IDENT_END)
+    | _each(_IDENT + [Kind.Underscore], States.IDENT)
+    | {Kind.Colon: States.SYMBOL},
+    States.LEADING0: _all(States.ZERO)
+    | _each(_DIGITS, States.DEC)
+    | {Kind.X: States.HEX_PRE},
+    States.HEX_PRE: _each(_HEX_DIGITS, States.HEX),
+    States.HEX: _all(States.HEX_END) | _each(_HEX_DIGITS, States.HEX),
+    States.SIGN: _each(_DIGITS, States.DEC),
+    States.DEC: _all(States.DEC_END) | _each(_DIGITS, States.DEC),
+}
+
+# True if the last character read belongs to the next token.
+final: Dict[States, bool] = {
+    States.EMPTY: False,
+    States.COMMA: False,
+    States.COMMENT_END: True,
+    States.IDENT_END: True,
+    States.SYMBOL: False,
+    States.ZERO: True,
+    States.HEX_END: True,
+    States.DEC_END: True,
+    States.INVALID: False,
+}
+
+DFA = compile_dfa(
+    States, Kind, classify, transitions, States.START, States.INVALID, final
+)
+
+
+class DFALexer(LineLexer):
+    def tokenize_line(self, line: str) -> List[Token]:
+        classes, table, pushback = DFA.classes, DFA.transitions, DFA.pushback
+        start_row, first_final, stride = DFA.start, DFA.first_final, DFA.stride
+        # Lexer treats EOF as "\n", but does not report Empty if EOF is the
+        # very first thing it reads.
+        eof = len(line) if not line.endswith("\n") else -1
+        data = line.encode("ascii") if eof < 0 else (line + "\n").encode()
+
+        ret: List[Token] = []
+        pos, end = 0, len(data)
+        while pos < end and pos != eof:
+            row, begin = start_row, pos
+            while row < first_final:
+                row = table[row + classes[data[pos]]]
+                pos += 1
+                if row == start_row:
+                    begin = pos
+            state = row // stride
+            if pushback[state]:
+                pos -= 1
+            match state:
+                case States.IDENT_END:
+                    ret.append(tokens.Identifier(intern(line[begin:pos])))
+                case States.COMMA:
+                    ret.append(tokens.COMMA)
+                case States.EMPTY:
+                    ret.append(tokens.EMPTY)
+                case States.DEC_END | States.ZERO:
+                    ret.append(tokens.Decimal(int(line[begin:pos])))
+                case States.SYMBOL:
+                    ret.append(tokens.Symbol(intern(line[begin : pos - 1])))
+                case States.COMMENT_END:
+                    ret.append(tokens.Comment(line[begin + 1 : pos]))
+                case States.HEX_END:
+                    value = int(line[begin + 2 : pos], 16)
+                    ret.append(tokens.Hexadecimal(value))
+                case _:
+                    ret.append(tokens.INVALID)
+        return ret
@@ -0,0 +1,56 @@
+from collections.abc import Buffer
+from typing import Iterator, List, Tuple
+
+from .ir import DyadicLine, ErrorLine, IRLine, MonadicLine
+from .mnemonics import AddressingMode, InstructionType, INSTRUCTION_TYPES
+from .mnemonics import MNEMONIC_IDS, MODE_COUNT, OPCODES, INVALID_OPCODE
+from .operands import Hexadecimal
+
+# (mnemonic, length in bytes, addressing mode) for one opcode. Unary
+# instructions have no addressing mode.
+type Decoding = Tuple[str, int, AddressingMode | None]
+
+
+def _decode_table() -> List[Decoding | None]:
+    table: List[Decoding | None] = [None] * 256
+    for mnemonic, mn_type in INSTRUCTION_TYPES.items():
+        row = MNEMONIC_IDS[mnemonic] * MODE_COUNT
+        for am in AddressingMode:
+            if (opcode := OPCODES[row + am.value]) == INVALID_OPCODE:
+                continue
+            elif mn_type in (InstructionType.M, InstructionType.R):
+                table[opcode] = (mnemonic, 1, None)
+            else:
+                table[opcode] = (mnemonic, 3, am)
+    return table
+
+
+# Indexed by opcode. Opcodes which no instruction uses are None.
+DECODE: List[Decoding | None] = _decode_table()
+
+
+# Decode object code one instruction at a time, with memory addresses counted
+# from base_address. Unused opcodes produce an ErrorLine and decoding resumes
+# at the next byte; an instruction cut off by the end of the buffer produces
+# an ErrorLine and ends decoding.
+def disassemble(object_code: Buffer, base_address: int = 0) -> Iterator[IRLine]:
+    data = memoryview(object_code).cast("B")
+    decode, pos, end = DECODE, 0, len(data)
+    while pos < end:
+        if not (decoding := decode[opcode := data[pos]]):
+            yield ErrorLine(comment=f"Illegal opcode: 0x{opcode:02x}")
+            pos += 1
+            continue
+
+        mnemonic, length, am = decoding
+        if pos + length > end:
+            message = f"Truncated instruction: {mnemonic}"
+            yield ErrorLine(comment=message)
+            return
+        elif am is None:
+            yield MonadicLine(mnemonic, memory_address=base_address + pos)
+        else:
+            operand = Hexadecimal(data[pos + 1] << 8 | data[pos + 2])
+            address = base_address + pos
+            yield DyadicLine(mnemonic, operand, am, memory_address=address)
+        pos += length
@@ -0,0 +1,139 @@
+import dataclasses
+from typing import Dict, Tuple
+
+from .ir import DyadicLine, MonadicLine, source
+from .mnemonics import AddressingMode
+from .operands import Decimal, Hexadecimal, Identifier, OperandType
+from .symbol import SymbolEntry
+
+type Template = DyadicLine | MonadicLine
+
+
+# One placement of a shared instruction template. The template carries what is
+# identical across repeats (mnemonic, operand, addressing mode) and must not be
+# modified; the address, symbol and comment belong to the placement.
+class PlacedLine:
+    __slots__ = ("template", "symbol_decl", "comment", "memory_address")
+
+    def __init__(
+        self,
+        template: Template,
+        symbol_decl: SymbolEntry | None = None,
+        comment: str | None = None,
+        memory_address: int | None = None,
+    ):
+        self.template = template
+        self.symbol_decl = symbol_decl
+        self.comment = comment
+        self.memory_address = memory_address
+
+    @property
+    def mnemonic(self) -> str:
+        return self.template.mnemonic
+
+    @property
+    def operand_spec(self) -> OperandType | None:
+        return getattr(self.template, "operand_spec", None)
+
+    @property
+    def addressing_mode(self) -> AddressingMode | None:
+        return getattr(self.template, "addressing_mode", None)
+
+    def source(self) -> str:
+        args = []
+        if type(template := self.template) is DyadicLine:
+            mode = template.addressing_mode.name.lower()
+            args = [str(template.operand_spec), mode]
+        return source(template.mnemonic, args, self.symbol_decl, self.comment)
+
+    def object_code(self) -> bytes:
+        return self.template.object_code()
+
+    def __len__(self) -> int:
+        return len(self.template)
+
+    def __repr__(self):
+        placed = dataclasses.replace(
+            self.template,
+            symbol_decl=self.symbol_decl,
+            comment=self.comment,
+            memory_address=self.memory_address,
+        )
+        return repr(placed)
+
+
+# Interns operands and instruction templates, so each distinct operand and
+# instruction exists once however many times it is placed. Operands must be
+# treated as immutable once interned. A pool holds on to every symbol its
+# operands reference, so use one per program.
+class Flyweights:
+    def __init__(self) -> None:
+        self._operands: Dict[Tuple[type, object], OperandType] = {}
+        self._templates: Dict[Tuple, Template] = {}
+
+    def decimal(self, value: int) -> Decimal:
+        if (ret := self._operands.get((Decimal, value))) is None:
+            ret = self._operands[(Decimal, value)] = Decimal(value)
+        return ret  # type: ignore[return-value]
+
+    def hexadecimal(self, value: int) -> Hexadecimal:
+        if (ret := self._operands.get((Hexadecimal, value))) is None:
+            ret = self._operands[(Hexadecimal, value)] = Hexadecimal(value)
+        return ret  # type: ignore[return-value]
+
+    def identifier(self, symbol: SymbolEntry) -> Identifier:
+        if (ret := self._operands.get((Identifier, symbol))) is None:
+            ret = self._operands[(Identifier, symbol)] = Identifier(symbol)
+        return ret  # type: ignore[return-value]
+
+    # Intern an operand which may have been built elsewhere.
+    def operand(self, operand: OperandType) -> OperandType:
+        match operand:
+            case Decimal():
+                return self.decimal(operand.value)
+            case Hexadecimal():
+                return self.hexadecimal(operand.value)
+            case Identifier():
+                return self.identifier(operand.symbol)
+        return operand
+
+    def template(
+        self,
+        mnemonic: str,
+        operand: OperandType | None = None,
+        addressing_mode: AddressingMode | None = None,
+    ) -> Template:
+        if (operand is None) != (addressing_mode is None):
+            raise ValueError(
+                f"{mnemonic} needs both an operand and an addressing mode"
+            )
+        # Operands are interned, so they compare by identity.
+        operand = None if operand is None else self.operand(operand)
+        key = (mnemonic.upper(), operand, addressing_mode)
+        if (ret := self._templates.get(key)) is None:
+            if operand is None or addressing_mode is None:
+                ret = MonadicLine(mnemonic)
+            else:
+                ret = DyadicLine(mnemonic, operand, addressing_mode)
+            self._templates[key] = ret
+        return ret
+
+    def line(
+        self,
+        mnemonic: str,
+        operand: OperandType | None = None,
+        addressing_mode: AddressingMode | None = None,
+        symbol_decl: SymbolEntry | None = None,
+        comment: str | None = None,
+    ) -> PlacedLine:
+        template = self.template(mnemonic, operand, addressing_mode)
+        return PlacedLine(template, symbol_decl, comment)
+
+    # Re-express an existing line as a placement of a shared template.
+    def place(self, line: Template) -> PlacedLine:
+        operand = getattr(line, "operand_spec", None)
+        mode = getattr(line, "addressing_mode", None)
+        template = self.template(line.mnemonic, operand, mode)
+        return PlacedLine(
+            template, line.symbol_decl, line.comment, line.memory_address
+        )
@@ -1,10 +1,11 @@
 import itertools
-from typing import List, Protocol, runtime_checkable
-from dataclasses import dataclass
+from typing import List, Protocol, Tuple, runtime_checkable
+from dataclasses import dataclass, field
 
 from .symbol import SymbolEntry
 from .mnemonics import AddressingMode, INSTRUCTION_TYPES, as_int
-from .operands import OperandType
+from .mnemonics import MNEMONIC_IDS, MODE_COUNT, OPCODES
+from .operands import Decimal, Hexadecimal, Identifier, OperandType
 
 
 @runtime_checkable
@@ -16,7 +17,7 @@ class IRLine(Protocol):
 class GeneratesObjectCode(IRLine, Protocol):
     memory_address: int | None
 
-    def object_code(self) -> bytearray: ...
+    def object_code(self) -> bytes: ...
     def __len__(self) -> int: ...
 
 
@@ -72,17 +73,44 @@ class DyadicLine:
     symbol_decl: SymbolEntry | None = None
     comment: str | None = None
     memory_address: int | None = None
+    # Key and result of the last object_code().
+    _code: Tuple[Tuple, bytes] | None = field(
+        default=None, init=False, repr=False, compare=False
+    )
 
     def source(self) -> str:
         args = [str(self.operand_spec), self.addressing_mode.name.lower()]
         mn = self.mnemonic.upper()
         return source(mn, args, self.symbol_decl, self.comment)
 
-    def object_code(self) -> bytearray:
-        bits = as_int(self.mnemonic, am=self.addressing_mode)
+    # Everything the encoding depends on. Operands compare by identity, so
+    # their value (or their symbol's version) is part of the key as well.
+    def _code_key(self) -> Tuple | None:
+        operand = self.operand_spec
+        if type(operand) is Identifier:
+            symbol = operand.symbol
+            stamp: object = (symbol, symbol.version)
+        elif type(operand) is Decimal or type(operand) is Hexadecimal:
+            stamp = operand.value
+        else:
+            return None
+        return (self.mnemonic, self.addressing_mode, operand, stamp)
+
+    def object_code(self) -> bytes:
+        key = self._code_key()
+        if key is not None and self._code and self._code[0] == key:
+            return self._code[1]
+        row = MNEMONIC_IDS[self.mnemonic] * MODE_COUNT
+        if (bits := OPCODES[row + self.addressing_mode.value]) < 0:
+            # Raises the TypeError explaining why there is no encoding.
+            bits = as_int(self.mnemonic, am=self.addressing_mode)
         mn_bytes = bits.to_bytes(1, signed=False)
-        opr_bytes = int(self.operand_spec).to_bytes(2)
-        return bytearray(mn_bytes + opr_bytes)
+        # Negative operands are stored in two's complement, as parsed.
+        operand = int(self.operand_spec)
+        code = mn_bytes + operand.to_bytes(2, signed=operand < 0)
+        if key is not None:
+            self._code = (key, code)
+        return code
 
     def __len__(self) -> int:
         return 3
@@ -110,15 +138,23 @@ class MonadicLine:
     symbol_decl: SymbolEntry | None = None
     comment: str | None = None
     memory_address: int | None = None
+    # Mnemonic and result of the last object_code().
+    _code: Tuple[str, bytes] | None = field(
+        default=None, init=False, repr=False, compare=False
+    )
 
     def source(self) -> str:
         mn = self.mnemonic.upper()
         return source(mn, [], self.symbol_decl, self.comment)
 
-    def object_code(self) -> bytearray:
+    def object_code(self) -> bytes:
+        # Keyed on the mnemonic alone.
+        if self._code and self._code[0] is self.mnemonic:
+            return self._code[1]
         bits = as_int(self.mnemonic)
         mn_bytes = bits.to_bytes(1, signed=False)
-        return bytearray(mn_bytes)
+        self._code = (self.mnemonic, mn_bytes)
+        return mn_bytes
 
     def __len__(self) -> int:
         return 1
@@ -148,13 +184,13 @@ def listing(ir: IRLine) -> List[str]:
         )
         object_code = ir.object_code()
         if len(object_code) <= 3:
-            line_object_code, object_code = object_code, bytearray(0)
+            line_object_code, object_code = object_code, bytes(0)
         else:
             line_object_code = object_code[0:2]
             object_code = object_code[3:]
     else:
         address_str = 4 * " "
-        line_object_code, object_code = bytearray(0), bytearray(0)
+        line_object_code, object_code = bytes(0), bytes(0)
     lines = [f"{address_str} {oc_format(line_object_code):6} {ir.source()}"]
     for b in itertools.batched(object_code, 3):
         lines.append(f"{'':4} {oc_format(b): 6}")
@@ -1,13 +1,19 @@
 import io
 import os
 import string
+import sys
+from collections import deque
 from enum import Enum
-from typing import Literal, List
+from typing import Deque, Literal, List
 
 import cs6th_ch7.pep10.tokens as tokens
 from .tokens import Token
 from ..utils.buffer import TokenProducer
 
+# Last characters of a line which begin a token that consumes the "\n" after
+# them: a dangling sign or hex prefix becomes Invalid, swallowing the "\n".
+SWALLOWS_NEWLINE = ("+", "-", "x", "X")
+
 
 class Lexer(TokenProducer[Token]):
     class States(Enum):
@@ -25,7 +31,7 @@ class Lexer(TokenProducer[Token]):
         as_str_list: List[str] = []
         as_int: int = 0
         sign: Literal[-1, 1] = 1
-        token: Token = tokens.Empty()
+        token: Token = tokens.EMPTY
         initial_pos = self.buffer.tell()
 
         while state != Lexer.States.STOP and (
@@ -43,7 +49,7 @@ class Lexer(TokenProducer[Token]):
                         state = Lexer.States.STOP
                     elif ch == ",":
                         state = Lexer.States.STOP
-                        token = tokens.Comma()
+                        token = tokens.COMMA
                     elif ch.isspace():
                         pass
                     elif ch == ";":
@@ -60,7 +66,7 @@ class Lexer(TokenProducer[Token]):
                         state = Lexer.States.SIGN
                         sign = -1 if ch == "-" else 1
                     else:
-                        token = tokens.Invalid()
+                        token = tokens.INVALID
 
                 case Lexer.States.COMMENT:
                     if ch == "\n":
@@ -75,12 +81,12 @@ class Lexer(TokenProducer[Token]):
                         as_str_list.append(ch)
                     elif ch == ":":
                         state = Lexer.States.STOP
-                        token = tokens.Symbol("".join(as_str_list))
+                        token = tokens.Symbol(sys.intern("".join(as_str_list)))
                     else:
                         self.buffer.seek(prev_pos, os.SEEK_SET)
                         state = Lexer.States.STOP
                         as_str = "".join(as_str_list)
-                        token = tokens.Identifier(as_str)
+                        token = tokens.Identifier(sys.intern(as_str))
 
                 case Lexer.States.LEADING0:
                     if ch.isdigit():
@@ -102,7 +108,7 @@ class Lexer(TokenProducer[Token]):
                         digit = 10 + ord(ch.lower()) - ord("a")
                         as_int = as_int * 16 + digit
                     else:
-                        token = tokens.Invalid()
+                        token = tokens.INVALID
 
                 case Lexer.States.HEX:
                     if ch in string.digits:
@@ -120,7 +126,7 @@ class Lexer(TokenProducer[Token]):
                         as_int = as_int * 10 + (ord(ch) - ord("0"))
                         state = Lexer.States.DEC
                     else:
-                        token = tokens.Invalid()
+                        token = tokens.INVALID
 
                 case Lexer.States.DEC:
                     if ch in string.digits:
@@ -130,10 +136,61 @@ class Lexer(TokenProducer[Token]):
                         state = Lexer.States.STOP
                         token = tokens.Decimal(sign * as_int)
                 case _:
-                    token = tokens.Invalid()
+                    token = tokens.INVALID
 
         return token
 
+    # Discard tokens through the next Empty, which is normally the rest of
+    # the line. Only when the line ends in a sign or hex prefix does its "\n"
+    # belong to an Invalid token, so the following line must be lexed too.
+    def skip_to_next_line(self):
+        pos = self.buffer.tell()
+        line = self.buffer.readline()
+        if line.endswith("\n") and line[-2:-1] not in SWALLOWS_NEWLINE:
+            return
+        self.buffer.seek(pos, os.SEEK_SET)
+        for token in self:
+            if type(token) is tokens.Empty:
+                break
+
+
+# Base for engines which tokenize an entire line per refill rather than one
+# character per read. Subclasses only see ASCII lines and must produce exactly
+# the tokens Lexer would, including where Invalid swallows the trailing newline.
+# Lines with other characters defer to Lexer, whose str.isalpha()/isdecimal()
+# checks do not map cleanly onto ASCII character classes.
+class LineLexer(TokenProducer[Token]):
+    def __init__(self, buffer: io.StringIO) -> None:
+        self.buffer: io.StringIO = buffer
+        self._pending: Deque[Token] = deque()
+
+    def __iter__(self) -> "LineLexer":
+        return self
+
+    def __next__(self) -> Token:
+        while not self._pending:
+            if not (line := self.buffer.readline()):
+                raise StopIteration()
+            elif line.isascii():
+                self._pending.extend(self.tokenize_line(line))
+            else:
+                self._pending.extend(Lexer(io.StringIO(line)))
+        return self._pending.popleft()
+
+    def tokenize_line(self, line: str) -> List[Token]:
+        raise NotImplementedError()
+
+    # As Lexer.skip_to_next_line, but whole lines are tokenized at a time.
     def skip_to_next_line(self):
-        while (ch := self.buffer.read(1)) != "\n" and len(ch) > 0:
-            pass
+        while True:
+            while self._pending:
+                if type(self._pending.popleft()) is tokens.Empty:
+                    return
+            if not (line := self.buffer.readline()):
+                return
+            elif line.endswith("\n") and line[-2:-1] not in SWALLOWS_NEWLINE:
+                return
+            elif line.isascii():
+                self._pending.extend(self.tokenize_line(line))
+            else:
+                self._pending.extend(Lexer(io.StringIO(line)))
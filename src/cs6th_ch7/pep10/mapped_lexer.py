@@ -0,0 +1,127 @@
+import io
+import mmap
+import re
+from sys import intern
+from typing import Iterator
+
+import cs6th_ch7.pep10.tokens as tokens
+from .tokens import Token
+from .lexer import Lexer
+from ..utils.buffer import TokenProducer
+
+# Byte-level twin of regex_lexer._TOKEN. Dangling sign and hex prefixes are
+# split out so we can tell when they swallow the implicit trailing "\n". Files
+# are read as open() reads them in text mode: "\r\n" and "\r" are newlines,
+# and the separators are what str's \s matches in ASCII, "\x1c" to "\x1f"
+# included, rather than bytes' narrower \s.
+_SPACE = rb"[ \t\x0b\x0c\x1c-\x1f]"
+_TOKEN = re.compile(
+    rb"""%s*(?:
+        (?P<empty>\r\n?|\n)
+        |(?P<comma>,)
+        |;(?P<comment>[^\r\n]*)
+        |(?P<ident>[A-Za-z]\w*)(?P<symbol>:)?
+        |0[xX](?:(?P<hex>[0-9A-Fa-f]+)|(?P<dangling_hex>\Z)|\r\n?|[\s\S])
+        |(?P<dec>[+-]?[0-9]+)
+        |(?P<dangling>[+-]\Z)
+        |(?P<invalid>[+-](?:\r\n?|[\s\S])|\S)
+    )""" % _SPACE,
+    re.VERBOSE,
+)
+_NON_ASCII_LINE = re.compile(rb"(?:^|(?<=\r))[^\r\n]*[\x80-\xff]", re.MULTILINE)
+_NEWLINE = re.compile(rb"\r\n?|\n")
+_WHITESPACE = b" \t\n\r\x0b\x0c\x1c\x1d\x1e\x1f"
+
+
+# Whether an encoding leaves ASCII as it is, so that MappedLexer can lex its
+# bytes directly.
+def ascii_compatible(encoding: str) -> bool:
+    ascii = bytes(range(0x80))
+    try:
+        return ascii.decode(encoding) == ascii.decode("ascii")
+    except UnicodeDecodeError:
+        return False
+
+
+# Sources which index by byte.
+type ByteSource = mmap.mmap | bytes | bytearray | memoryview
+
+
+# Lex a file's bytes (an mmap, or in-memory bytes such as a memoryview), in an
+# ASCII compatible encoding, without first decoding or copying them. Input is
+# normalized the same way as parse() of the file read as text: trailing
+# whitespace is dropped and the text is terminated by a single "\n". Only the
+# slices backing identifiers and comments are decoded; lines with non-ASCII
+# bytes are decoded and handed to Lexer so Unicode classification stays exact.
+class MappedLexer(TokenProducer[Token]):
+    def __init__(self, data: ByteSource, encoding: str = "utf-8") -> None:
+        self.data = data
+        self.encoding = encoding
+        self._end = self._content_end()
+        self._tokens = self._scan()
+
+    def __iter__(self) -> "MappedLexer":
+        return self
+
+    def __next__(self) -> Token:
+        return next(self._tokens)
+
+    # Equivalent of len(text.rstrip()), measured in bytes.
+    def _content_end(self) -> int:
+        data, end = self.data, len(memoryview(self.data))
+        while True:
+            while end and data[end - 1] in _WHITESPACE:
+                end -= 1
+            if end == 0 or data[end - 1] < 0x80:
+                return end
+            # Unicode whitespace can only be recognized once decoded.
+            start = end
+            while start and data[start - 1] not in b"\r\n":
+                start -= 1
+            tail = bytes(data[start:end]).decode(self.encoding)
+            if len(stripped := tail.rstrip()) == len(tail):
+                return end
+            end = start + len(stripped.encode(self.encoding))
+
+    def _scan(self) -> Iterator[Token]:
+        data, pos, end = self.data, 0, self._end
+        while pos < end:
+            bad = _NON_ASCII_LINE.search(data, pos, end)
+            stop = bad.start() if bad else end
+            for match in _TOKEN.finditer(data, pos, stop):
+                match match.lastgroup:
+                    case "ident":
+                        value = intern(match["ident"].decode("ascii"))
+                        yield tokens.Identifier(value)
+                    case "comma":
+                        yield tokens.COMMA
+                    case "empty":
+                        yield tokens.EMPTY
+                    case "dec":
+                        yield tokens.Decimal(int(match["dec"]))
+                    case "symbol":
+                        value = intern(match["ident"].decode("ascii"))
+                        yield tokens.Symbol(value)
+                    case "comment":
+                        yield tokens.Comment(match["comment"].decode("ascii"))
+                    case "hex":
+                        yield tokens.Hexadecimal(int(match["hex"], 16))
+                    case "dangling" | "dangling_hex":
+                        # Swallows the terminating "\n", so no final Empty.
+                        yield tokens.INVALID
+                        return
+                    case _:
+                        yield tokens.INVALID
+            if bad is None:
+                break
+            newline = _NEWLINE.search(data, stop, end)
+            pos = newline.end() if newline else end
+            # Newlines are translated, as open() does.
+            text = bytes(data[stop:pos]).decode(self.encoding)
+            line = text.replace("\r\n", "\n").replace("\r", "\n")
+            if pos == end:
+                # The final line carries the implicit terminator itself.
+                yield from Lexer(io.StringIO(line + "\n"))
+                return
+            yield from Lexer(io.StringIO(line))
+        yield tokens.EMPTY
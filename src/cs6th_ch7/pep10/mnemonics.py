@@ -1,5 +1,6 @@
+import array
 from enum import Enum
-from typing import Dict
+from typing import Dict, List, cast
 
 
 class AddressingMode(Enum):
@@ -28,14 +29,24 @@ class InstructionType(Enum):
     RAAA_noi = "RAAA_noi"
 
     def allows_addressing_mode(self, am: AddressingMode):
-        # Default to no allowed addressing modes
-        return am in {
-            "A_ix": {AddressingMode.I, AddressingMode.X},
-            "AAA_all": {am for am in AddressingMode},
-            "AAA_i": {AddressingMode.I},
-            "RAAA_all": {am for am in AddressingMode},
-            "RAAA_noi": {am for am in AddressingMode} - {AddressingMode.I},
-        }.get(self.value, {})
+        return bool(TYPE_MODES[self.value] >> am.value & 1)
+
+
+def mode_mask(*modes: AddressingMode) -> int:
+    return sum(1 << am.value for am in modes)
+
+
+# Bit n is set if the addressing mode with value n is allowed. Types missing
+# from the table allow no addressing modes.
+ALL_MODES = mode_mask(*AddressingMode)
+TYPE_MODES: Dict[str, int] = {
+    **{mn_type.value: 0 for mn_type in InstructionType},
+    "A_ix": mode_mask(AddressingMode.I, AddressingMode.X),
+    "AAA_all": ALL_MODES,
+    "AAA_i": mode_mask(AddressingMode.I),
+    "RAAA_all": ALL_MODES,
+    "RAAA_noi": ALL_MODES & ~mode_mask(AddressingMode.I),
+}
 
 
 M_INSTRUCTIONS = [
@@ -140,13 +151,35 @@ BITS: Dict[str, int] = {
 }
 
 
-def as_int(mnemonic: str, am: AddressingMode | None = None) -> int:
-    mnemonic = mnemonic.upper()
+def _encode(mnemonic: str, am: AddressingMode) -> int:
     bit_pattern, mn_type = BITS[mnemonic], INSTRUCTION_TYPES[mnemonic]
-
     if mn_type == InstructionType.M or mn_type == InstructionType.R:
         return bit_pattern
     elif mn_type == InstructionType.A_ix:
-        return bit_pattern | (0 if am is None else am.as_A())
-    else:
-        return bit_pattern | (0 if am is None else am.as_AAA())
+        if am not in (AddressingMode.I, AddressingMode.X):
+            return INVALID_OPCODE
+        return bit_pattern | am.as_A()
+    return bit_pattern | am.as_AAA()
+
+
+# Mnemonics are numbered in opcode order. A mnemonic's encoding with addressing
+# mode am is OPCODES[id * MODE_COUNT + am.value], and bit am.value of
+# LEGAL_MODES[id] is set if the assembler accepts that mode. Unary mnemonics
+# ignore the mode, and modes which cannot be encoded are INVALID_OPCODE.
+MNEMONICS: List[str] = list(BITS)
+MNEMONIC_IDS: Dict[str, int] = {mn: i for i, mn in enumerate(MNEMONICS)}
+MODE_COUNT = len(AddressingMode)
+INVALID_OPCODE = -1
+OPCODES = array.array(
+    "h", [_encode(mn, am) for mn in MNEMONICS for am in AddressingMode]
+)
+LEGAL_MODES = bytes(TYPE_MODES[INSTRUCTION_TYPES[mn].value] for mn in MNEMONICS)
+
+
+def as_int(mnemonic: str, am: AddressingMode | None = None) -> int:
+    row = MNEMONIC_IDS[mnemonic.upper()] * MODE_COUNT
+    # Without a mode, use the I column: the bare opcode for every type.
+    if (opcode := OPCODES[row + (0 if am is None else am.value)]) < 0:
+        message = f"Invalid addressing mode for A type: {cast(AddressingMode, am).name}"
+        raise TypeError(message)
+    return opcode
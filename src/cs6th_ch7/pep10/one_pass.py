@@ -0,0 +1,110 @@
+from typing import Dict, Iterable, List, Tuple
+
+from .ir import ErrorLine, GeneratesObjectCode, IRLine
+from .operands import Identifier
+from .symbol import SymbolEntry
+
+
+# Errors found while addressing a program one line at a time, numbered by line
+# so they can be reported as calculate_addresses would once every line has
+# been seen. Parsers define symbols as they go, so whether a symbol is multiply
+# defined or undefined is only settled at the end.
+class Diagnostics:
+    def __init__(self) -> None:
+        # (line number, message) for lines which failed to parse.
+        self._errors: List[Tuple[int, str]] = []
+        # Line numbers declaring each symbol.
+        self._declarations: Dict[SymbolEntry, List[int]] = {}
+        # Line numbers using each symbol which has not been declared yet.
+        self._uses: Dict[SymbolEntry, List[int]] = {}
+
+    def error(self, number: int, line: ErrorLine) -> None:
+        self._errors.append((number, line.source()))
+
+    # True for the first declaration of the symbol in this program.
+    def declare(self, number: int, symbol: SymbolEntry) -> bool:
+        if (numbers := self._declarations.get(symbol)) is not None:
+            numbers.append(number)
+            return False
+        self._declarations[symbol] = [number]
+        # Declared, so none of its uses can be undefined.
+        self._uses.pop(symbol, None)
+        return True
+
+    def use(self, number: int, symbol: SymbolEntry) -> None:
+        if symbol not in self._declarations:
+            self._uses.setdefault(symbol, []).append(number)
+
+    def errors(self) -> List[str]:
+        errors = list(self._errors)
+        for symbol, numbers in self._declarations.items():
+            if symbol.is_multiply_defined():
+                message = f"Multiply defined symbol: {symbol}"
+                errors.extend((number, message) for number in numbers)
+        for symbol, numbers in self._uses.items():
+            if symbol.is_undefined():
+                message = f"Undefined symbol: {symbol}"
+                errors.extend((number, message) for number in numbers)
+        # Stable, so a line's multiple definition precedes its undefined use.
+        errors.sort(key=lambda error: error[0])
+        return [message for _, message in errors]
+
+
+# Assembles lines as they are fed, e.g. straight from a Parser, without keeping
+# the IR. Each line's bytes are appended as soon as it is seen. An operand
+# naming a symbol without a value yet is written as zero and recorded as a
+# fixup, then patched in place once the line declaring the symbol is fed.
+# finish() reports the same errors as calculate_addresses, in line order.
+class OnePassAssembler:
+    def __init__(self, base_address: int = 0) -> None:
+        self.object_code = bytearray()
+        self.memory_address = base_address
+        self.diagnostics = Diagnostics()
+        self._line_number = 0
+        # Offsets in object_code of operands awaiting each symbol.
+        self._fixups: Dict[SymbolEntry, List[int]] = {}
+
+    def feed(self, line: IRLine) -> None:
+        number = self._line_number
+        self._line_number += 1
+        if type(line) is ErrorLine:
+            self.diagnostics.error(number, line)
+            return
+        elif not isinstance(line, GeneratesObjectCode):
+            return
+
+        line.memory_address = self.memory_address
+        # Declare first, so that a line may refer to its own symbol.
+        if symbol := getattr(line, "symbol_decl", None):
+            self._declare(symbol, number)
+        position = len(self.object_code)
+        self.object_code += line.object_code()
+        operand = getattr(line, "operand_spec", None)
+        if type(operand) is Identifier and operand.symbol.value is None:
+            self.diagnostics.use(number, operand.symbol)
+            self._fixups.setdefault(operand.symbol, []).append(position + 1)
+        self.memory_address += len(line)
+
+    def _declare(self, symbol: SymbolEntry, number: int) -> None:
+        # A later duplicate may yet turn up. Its error makes the object code
+        # moot either way.
+        first = self.diagnostics.declare(number, symbol)
+        if not first or symbol.is_multiply_defined():
+            return
+        symbol.value = self.memory_address
+        patch = self.memory_address.to_bytes(2)
+        for offset in self._fixups.pop(symbol, ()):
+            self.object_code[offset : offset + 2] = patch
+
+    # Object code and errors for every line fed so far.
+    def finish(self) -> Tuple[bytearray, List[str]]:
+        return self.object_code, self.diagnostics.errors()
+
+
+def assemble(
+    lines: Iterable[IRLine], base_address: int = 0
+) -> Tuple[bytearray, List[str]]:
+    assembler = OnePassAssembler(base_address)
+    for line in lines:
+        assembler.feed(line)
+    return assembler.finish()
@@ -1,14 +1,25 @@
 import io
-from typing import cast, List
+import locale
+import mmap
+import os
+import sys
+from collections.abc import Buffer
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import repeat
+from typing import Any, Callable, cast, Dict, List, Tuple
 from .ir import IRLine
 from .ir import EmptyLine, ErrorLine, CommentLine, DyadicLine
-from .lexer import Lexer
-from .mnemonics import INSTRUCTION_TYPES, AddressingMode
+from .columnar import ColumnBuffer, tokenize_columns
+from .lexer import Lexer, SWALLOWS_NEWLINE
+from .mapped_lexer import MappedLexer, ascii_compatible
+from .mnemonics import INSTRUCTION_TYPES, LEGAL_MODES, MNEMONIC_IDS
+from .mnemonics import AddressingMode, InstructionType
 from .symbol import SymbolTable, SymbolEntry
 import cs6th_ch7.pep10.tokens as tokens
 import cs6th_ch7.pep10.operands as operands
 from .operands import OperandType
-from ..utils.buffer import ParserBuffer
+from ..utils.buffer import ParserBuffer, TokenProducer
 
 """
 1. argument    ::= HEX | DEC | IDENT
@@ -18,101 +29,242 @@ from ..utils.buffer import ParserBuffer
 """
 
 
+type LexerType = Callable[[Any], TokenProducer[tokens.Token]]
+
+
 class Parser:
     def __init__(
-        self, buffer: io.StringIO, symbol_table: SymbolTable | None = None
+        self,
+        buffer: io.StringIO | Buffer,
+        symbol_table: SymbolTable | None = None,
+        lexer_type: LexerType = Lexer,
+        columnar: bool = False,
     ):
-        self.lexer = Lexer(buffer)
-        self._buffer = ParserBuffer(self.lexer)
+        self._buffer: ParserBuffer | ColumnBuffer
+        # The columnar buffer does its own tokenizing, with no lexer.
+        self.lexer: TokenProducer[tokens.Token] | None = None
+        if columnar:
+            if lexer_type is not Lexer:
+                raise ValueError("A columnar parser cannot take a lexer_type")
+            # Tokenize the whole buffer up front into parallel arrays.
+            columns = tokenize_columns(cast(io.StringIO, buffer).read())
+            self._buffer = ColumnBuffer(columns)
+        else:
+            self.lexer = lexer_type(buffer)
+            self._buffer = ParserBuffer(self.lexer)
         self.symbol_table = symbol_table if symbol_table else SymbolTable()
 
     def __iter__(self):
         return self
 
+    # Rules report malformed lines by returning an ErrorLine rather than
+    # raising, so a bad line costs no more to parse than a good one.
     def __next__(self) -> IRLine:
         if self._buffer.peek() is None:
             raise StopIteration()
-        try:
-            return self.statement()
-        except SyntaxError as s:
+        elif type(ret := self.statement()) is ErrorLine:
             self._buffer.skip_to_next_line({tokens.Empty})
-            return ErrorLine(comment=s.msg if s.msg else None)
-        except KeyError:
-            self._buffer.skip_to_next_line({tokens.Empty})
-            return ErrorLine()
+        return ret
 
     # argument ::= HEX | DEC | IDENT
     def argument(self) -> OperandType | None:
-        if hex_token := self._buffer.may_match(tokens.Hexadecimal):
-            return operands.Hexadecimal(hex_token.value)
-        elif dec_token := self._buffer.may_match(tokens.Decimal):
-            return operands.Decimal(dec_token.value)
-        elif ident_token := self._buffer.may_match(tokens.Identifier):
-            symbol_entry = self.symbol_table.reference(ident_token.value)
-            return operands.Identifier(symbol_entry)
-        return None
+        token = self._buffer.peek()
+        match token:
+            case tokens.Hexadecimal():
+                ret: OperandType = operands.Hexadecimal(token.value)
+            case tokens.Decimal():
+                ret = operands.Decimal(token.value)
+            case tokens.Identifier():
+                symbol_entry = self.symbol_table.reference(token.value)
+                ret = operands.Identifier(symbol_entry)
+            case _:
+                return None
+        self._buffer.advance()
+        return ret
 
     # instruction ::= IDENT argument COMMA IDENT
     def instruction(
         self, symbol_entry: SymbolEntry | None
-    ) -> DyadicLine | None:
+    ) -> DyadicLine | ErrorLine | None:
         if not (mn_token := self._buffer.may_match(tokens.Identifier)):
             return None
-        mn_str = mn_token.value.upper()
-        if mn_str not in INSTRUCTION_TYPES:
-            raise SyntaxError(f"Unrecognized mnemonic: {mn_str}")
-        elif not (arg_ir := self.argument()):
-            raise SyntaxError(f"Missing argument")
-
-        try:
-            arg_int = int(arg_ir)
-            arg_int.to_bytes(2, signed=arg_int < 0)
-        except OverflowError:
-            raise SyntaxError("Number too large")
-
-        self._buffer.must_match(tokens.Comma)
-        addr_str = self._buffer.must_match(tokens.Identifier).value.upper()
-        try:
-            # Check if addressing mode is valid for this mnemonic
-            addr_mode = cast(AddressingMode, AddressingMode[addr_str])
-            mn_type = INSTRUCTION_TYPES[mn_str]
-            if not mn_type.allows_addressing_mode(addr_mode):
-                err = f"Invalid addressing mode {addr_str} for {mn_str}"
-                raise SyntaxError(err)
-        except KeyError:
-            raise SyntaxError(f"Unknown addressing mode: {addr_str}")
+        mn_str = sys.intern(mn_token.value.upper())
+        if not (operand_rule := OPERAND_RULES.get(mn_str)):
+            return ErrorLine(comment=f"Unrecognized mnemonic: {mn_str}")
+        return operand_rule(self, mn_str, symbol_entry)
+
+    # Operands of an instruction: argument COMMA IDENT
+    def dyadic_operands(
+        self, mn_str: str, symbol_entry: SymbolEntry | None
+    ) -> DyadicLine | ErrorLine:
+        if not (arg_ir := self.argument()):
+            return ErrorLine(comment="Missing argument")
+        # Must fit in 2 bytes, as signed if negative and unsigned otherwise.
+        elif not -0x8000 <= int(arg_ir) <= 0xFFFF:
+            return ErrorLine(comment="Number too large")
+        elif not self._buffer.may_match(tokens.Comma):
+            return ErrorLine()
+        elif not (addr_token := self._buffer.may_match(tokens.Identifier)):
+            return ErrorLine()
+
+        addr_str = addr_token.value.upper()
+        if not (addr_mode := AddressingMode.__members__.get(addr_str)):
+            return ErrorLine(comment=f"Unknown addressing mode: {addr_str}")
+        # Check if addressing mode is valid for this mnemonic
+        elif not LEGAL_MODES[MNEMONIC_IDS[mn_str]] >> addr_mode.value & 1:
+            err = f"Invalid addressing mode {addr_str} for {mn_str}"
+            return ErrorLine(comment=err)
         return DyadicLine(mn_str, arg_ir, addr_mode, symbol_decl=symbol_entry)
 
     # line ::= instruction [COMMENT]
-    def line(self, symbol_entry: SymbolEntry | None) -> DyadicLine | None:
+    def line(
+        self, symbol_entry: SymbolEntry | None
+    ) -> DyadicLine | ErrorLine | None:
         return_ir = self.instruction(symbol_entry)
-        if not return_ir:
-            return None
-        elif comment := self._buffer.may_match(tokens.Comment):
-            return_ir.comment = comment.value
+        if type(return_ir) is DyadicLine:
+            if comment := self._buffer.may_match(tokens.Comment):
+                return_ir.comment = comment.value
         return return_ir
 
     # statement ::= [COMMENT  | ([SYMBOL] line)] EMPTY
     def statement(self) -> IRLine:
-        return_ir: IRLine | None = None
-        if self._buffer.may_match(tokens.Empty):
-            return EmptyLine()
-        elif comment_token := self._buffer.may_match(tokens.Comment):
-            return_ir = CommentLine(comment_token.value)
-        elif symbol_token := self._buffer.may_match(tokens.Symbol):
-            symbol_entry = self.symbol_table.define(symbol_token.value)
-            if not (return_ir := self.line(symbol_entry)):
-                message = "Symbol declaration must be followed by instruction"
-                raise SyntaxError(message)
-        elif not (return_ir := self.line(None)):
-            raise SyntaxError("Failed to parse line")
-
-        self._buffer.must_match(tokens.Empty)
-        return return_ir
+        first = self._buffer.peek()
+        rule = STATEMENT_RULES.get(type(first), Parser.invalid_statement)
+        return rule(self, first)
+
+    # The statement rules below are chosen by the statement's first token.
+    def empty_statement(self, first: tokens.Empty) -> IRLine:
+        self._buffer.advance()
+        return EmptyLine()
+
+    def comment_statement(self, first: tokens.Comment) -> IRLine:
+        self._buffer.advance()
+        return self.end_statement(CommentLine(first.value))
+
+    def symbol_statement(self, first: tokens.Symbol) -> IRLine:
+        self._buffer.advance()
+        symbol_entry = self.symbol_table.define(first.value)
+        if not (return_ir := self.line(symbol_entry)):
+            message = "Symbol declaration must be followed by instruction"
+            return ErrorLine(comment=message)
+        return self.end_statement(return_ir)
+
+    def line_statement(self, first: tokens.Identifier) -> IRLine:
+        return self.end_statement(cast(IRLine, self.line(None)))
 
+    def invalid_statement(self, first: tokens.Token | None) -> IRLine:
+        return ErrorLine(comment="Failed to parse line")
 
-def parse(text: str, symbol_table: SymbolTable | None = None) -> List[IRLine]:
+    def end_statement(self, return_ir: IRLine) -> IRLine:
+        if type(return_ir) is ErrorLine or self._buffer.may_match(tokens.Empty):
+            return return_ir
+        return ErrorLine()
+
+
+# FIRST sets of the alternatives of statement.
+STATEMENT_RULES: Dict[type, Callable[[Parser, Any], IRLine]] = {
+    tokens.Empty: Parser.empty_statement,
+    tokens.Comment: Parser.comment_statement,
+    tokens.Symbol: Parser.symbol_statement,
+    tokens.Identifier: Parser.line_statement,
+}
+
+type OperandRule = Callable[
+    [Parser, str, SymbolEntry | None], DyadicLine | ErrorLine
+]
+# Unary instructions share the dyadic rule until Problem 7.## gives M- and
+# R-type instructions their own.
+_TYPE_RULES: Dict[InstructionType, OperandRule] = {
+    mn_type: Parser.dyadic_operands for mn_type in InstructionType
+}
+OPERAND_RULES: Dict[str, OperandRule] = {
+    mn_str: _TYPE_RULES[mn_type]
+    for mn_str, mn_type in INSTRUCTION_TYPES.items()
+}
+
+
+def parse(
+    text: str,
+    symbol_table: SymbolTable | None = None,
+    lexer_type: LexerType = Lexer,
+    columnar: bool = False,
+) -> List[IRLine]:
     # Ensure input is terminated with a single \n.
-    parser = Parser(io.StringIO(text.rstrip() + "\n"), symbol_table)
-    
+    buffer = io.StringIO(text.rstrip() + "\n")
+    parser = Parser(buffer, symbol_table, lexer_type, columnar)
     return [item for item in parser]
+
+
+# parse() of the file as open(path).read() would return it. The encoding
+# defaults to the locale's, as open()'s does.
+def parse_file(
+    path: str | os.PathLike,
+    symbol_table: SymbolTable | None = None,
+    encoding: str | None = None,
+) -> List[IRLine]:
+    encoding = encoding or locale.getpreferredencoding(False)
+    if not ascii_compatible(encoding):
+        with open(path, "r", encoding=encoding) as f:
+            return parse(f.read(), symbol_table)
+    # Lex straight from the page cache; MappedLexer applies parse()'s rstrip.
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return parse("", symbol_table)
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            lexer_type = partial(MappedLexer, encoding=encoding)
+            parser = Parser(data, symbol_table, lexer_type)
+            return [item for item in parser]
+
+
+# Split text after "\n"s into about `parts` chunks. A line ending in a sign or
+# hex prefix may continue onto the next line, so no chunk ends after one.
+def split_lines(text: str, parts: int) -> List[str]:
+    size, start, chunks = max(1, len(text) // max(1, parts)), 0, []
+    while start < len(text):
+        end = text.find("\n", start + size - 1)
+        while end != -1 and text[end - 1 : end] in SWALLOWS_NEWLINE:
+            end = text.find("\n", end + 1)
+        end = len(text) if end == -1 else end + 1
+        chunks.append(text[start:end])
+        start = end
+    return chunks
+
+
+def _parse_chunk(
+    chunk: str, lexer_type: LexerType
+) -> Tuple[List[IRLine], SymbolTable]:
+    # Chunks already end in "\n", and must not be stripped.
+    parser = Parser(io.StringIO(chunk), None, lexer_type)
+    return [item for item in parser], parser.symbol_table
+
+
+# parse(), with chunks of the text parsed in worker processes. Each chunk gets
+# its own SymbolTable; afterwards definitions are merged into symbol_table, in
+# order, and every line is rebound to the merged entries.
+def parse_parallel(
+    text: str,
+    symbol_table: SymbolTable | None = None,
+    lexer_type: LexerType = Lexer,
+    jobs: int | None = None,
+) -> List[IRLine]:
+    jobs = jobs or os.cpu_count() or 1
+    text = text.rstrip() + "\n"
+    chunks = split_lines(text, jobs)
+    if len(chunks) < 2:
+        return parse(text, symbol_table, lexer_type)
+
+    symbol_table = symbol_table if symbol_table else SymbolTable()
+    ret: List[IRLine] = []
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        results = executor.map(_parse_chunk, chunks, repeat(lexer_type))
+        for lines, local_table in results:
+            ids = symbol_table.merge(local_table)
+            entry = symbol_table.entry
+            for line in lines:
+                if symbol := getattr(line, "symbol_decl", None):
+                    line.symbol_decl = entry(ids[symbol.id])  # type: ignore
+                operand = getattr(line, "operand_spec", None)
+                if type(operand) is operands.Identifier:
+                    operand.symbol = entry(ids[operand.symbol.id])
+            ret.extend(lines)
+    return ret
@@ -0,0 +1,153 @@
+import io
+from collections import deque
+from typing import BinaryIO, Deque, Iterator, List, TextIO, cast
+
+from .flyweight import PlacedLine
+from .ir import DyadicLine, ErrorLine, GeneratesObjectCode, IRLine, listing
+from .ir import CommentLine, EmptyLine, MonadicLine
+from .one_pass import Diagnostics
+from .operands import Identifier
+from .parser import Parser
+from .regex_lexer import RegexLexer
+from .symbol import SymbolEntry, SymbolTable
+
+# Assembly as a chain of generators: lines are lexed and parsed as they are
+# read, addressed, then written out as soon as their encoding is known. Only
+# lines behind an unresolved forward reference are held, so memory does not
+# grow with the length of the program unless forward references do.
+
+
+# readline() over a text stream, giving the lines parse() would see for its
+# whole text: trailing whitespace dropped and the last line "\n"-terminated.
+# Runs of blank lines are held back until it is clear they are not trailing.
+class _TrimmedLines:
+    def __init__(self, stream: TextIO) -> None:
+        self._lines = self._trim(stream)
+
+    def readline(self) -> str:
+        return next(self._lines, "")
+
+    @staticmethod
+    def _trim(stream: TextIO) -> Iterator[str]:
+        blank: List[str] = []
+        previous: str | None = None
+        for line in stream:
+            if line.isspace():
+                blank.append(line)
+                continue
+            if previous is not None:
+                yield previous
+            yield from blank
+            blank.clear()
+            previous = line
+        yield "\n" if previous is None else previous.rstrip() + "\n"
+
+
+def parse_stream(
+    stream: TextIO, symbol_table: SymbolTable | None = None
+) -> Iterator[IRLine]:
+    # RegexLexer only ever calls readline().
+    buffer = cast(io.StringIO, _TrimmedLines(stream))
+    return Parser(buffer, symbol_table, RegexLexer)
+
+
+# Checking the protocol costs more than addressing a line, so the IR's own
+# line types are looked up by type first.
+_CODE_LINES = frozenset((DyadicLine, MonadicLine, PlacedLine))
+_TEXT_LINES = frozenset((EmptyLine, CommentLine, ErrorLine))
+
+
+def _is_code(line: IRLine) -> bool:
+    if (kind := type(line)) in _CODE_LINES:
+        return True
+    elif kind in _TEXT_LINES:
+        return False
+    return isinstance(line, GeneratesObjectCode)
+
+
+# The symbol an instruction's operand is waiting on, if any.
+def _unresolved(line: IRLine) -> SymbolEntry | None:
+    operand = getattr(line, "operand_spec", None)
+    if type(operand) is Identifier and operand.symbol.value is None:
+        return operand.symbol
+    return None
+
+
+# calculate_addresses as a generator. Lines are yielded in order once every
+# symbol they use has a value; error lines are recorded and dropped. Errors
+# are only complete once the generator is exhausted.
+def address_stream(
+    lines: Iterator[IRLine], diagnostics: Diagnostics, base_address: int = 0
+) -> Iterator[IRLine]:
+    pending: Deque[IRLine] = deque()
+    memory_address = base_address
+    for number, line in enumerate(lines):
+        if type(line) is ErrorLine:
+            diagnostics.error(number, line)
+            continue
+        elif _is_code(line):
+            line = cast(GeneratesObjectCode, line)
+            line.memory_address = memory_address
+            if symbol := getattr(line, "symbol_decl", None):
+                first = diagnostics.declare(number, symbol)
+                if first and not symbol.is_multiply_defined():
+                    symbol.value = memory_address
+            if (symbol := _unresolved(line)) is not None:
+                diagnostics.use(number, symbol)
+            memory_address += len(line)
+        pending.append(line)
+        while pending and _unresolved(pending[0]) is None:
+            yield pending.popleft()
+    # Whatever remains refers to symbols which never got a value.
+    yield from pending
+
+
+# Write each line's object code and listing as it arrives. Returns the number
+# of bytes of object code.
+def emit_stream(
+    lines: Iterator[IRLine],
+    object_out: BinaryIO | None = None,
+    listing_out: TextIO | None = None,
+) -> int:
+    size = 0
+    for line in lines:
+        if not _is_code(line):
+            if listing_out is not None:
+                listing_out.write(f"{'':4} {'':6} {line.source()}\n")
+            continue
+        code = cast(GeneratesObjectCode, line).object_code()
+        size += len(code)
+        if object_out is not None:
+            object_out.write(code)
+        if listing_out is None:
+            continue
+        elif len(code) > 3:
+            # Continuation rows, as laid out by ir.listing.
+            listing_out.writelines(row + "\n" for row in listing(line))
+            continue
+        address = cast(GeneratesObjectCode, line).memory_address
+        address_str = f"{address:04X}" if address is not None else 4 * " "
+        listing_out.write(
+            f"{address_str} {code.hex().upper():6} {line.source()}\n"
+        )
+    return size
+
+
+# Lex, parse, address and emit a program read from stream. Returns the errors
+# calculate_addresses would report; output written before an error is found
+# should be discarded.
+def assemble_stream(
+    stream: TextIO,
+    object_out: BinaryIO | None = None,
+    listing_out: TextIO | None = None,
+    symbol_table: SymbolTable | None = None,
+    base_address: int = 0,
+) -> List[str]:
+    diagnostics = Diagnostics()
+    lines = parse_stream(stream, symbol_table)
+    emit_stream(
+        address_stream(lines, diagnostics, base_address),
+        object_out,
+        listing_out,
+    )
+    return diagnostics.errors()
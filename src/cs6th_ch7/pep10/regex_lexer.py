@@ -0,0 +1,50 @@
+import re
+from sys import intern
+from typing import List
+
+import cs6th_ch7.pep10.tokens as tokens
+from .tokens import Token
+from .lexer import LineLexer
+
+# One alternative per terminal state of Lexer. Alternatives are tried in order,
+# so a malformed hex prefix must be rejected before DEC can claim its leading 0.
+# A dangling sign or hex prefix consumes the following character, even "\n".
+# Every match consumes at least one character, so finditer() walks the line
+# token by token; Lexer only reports Empty at EOF if it skipped whitespace.
+TOKEN_PATTERN = re.compile(
+    r"""[^\S\n]*(?:
+        (?P<empty>\n)
+        |(?P<comma>,)
+        |;(?P<comment>[^\n]*)
+        |(?P<ident>[A-Za-z]\w*)(?P<symbol>:)?
+        |0[xX](?:(?P<hex>[0-9A-Fa-f]+)|(?P<bad_hex>[\s\S]?))
+        |(?P<dec>[+-]?[0-9]+)
+        |(?P<invalid>[+-][\s\S]?|\S)
+    )
+    |(?P<eof>[^\S\n]+\Z)""",
+    re.VERBOSE,
+)
+
+
+class RegexLexer(LineLexer):
+    def tokenize_line(self, line: str) -> List[Token]:
+        ret: List[Token] = []
+        for match in TOKEN_PATTERN.finditer(line):
+            match match.lastgroup:
+                case "ident":
+                    ret.append(tokens.Identifier(intern(match["ident"])))
+                case "comma":
+                    ret.append(tokens.COMMA)
+                case "empty" | "eof":
+                    ret.append(tokens.EMPTY)
+                case "dec":
+                    ret.append(tokens.Decimal(int(match["dec"])))
+                case "symbol":
+                    ret.append(tokens.Symbol(intern(match["ident"])))
+                case "comment":
+                    ret.append(tokens.Comment(match["comment"]))
+                case "hex":
+                    ret.append(tokens.Hexadecimal(int(match["hex"], 16)))
+                case _:
+                    ret.append(tokens.INVALID)
+        return ret
@@ -1,43 +1,201 @@
-from typing import Dict
+import array
+import sys
+from typing import Dict, Iterator, List, Tuple, cast
 
+# Stored in SymbolTable.values for a symbol which has no value. Values are
+# 32-bit, so this is the one 32-bit value a symbol cannot have.
+NO_VALUE = -(2**31)
 
+# One field of every symbol, indexed by id. Read-only views once frozen.
+type Column = array.array[int] | memoryview
+
+
+# A view of one row of a SymbolTable. Views are made on lookup rather than
+# kept, so the table's arrays are its only per-symbol storage; views of the
+# same symbol compare and hash equal.
 class SymbolEntry:
-    def __init__(self, name: str):
-        self.name: str = name
-        self.definition_count: int = 0
-        self.value: int | None = None
+    __slots__ = ("table", "id")
+
+    def __init__(self, table: "SymbolTable", id: int):
+        self.table = table
+        self.id = id
+
+    @property
+    def name(self) -> str:
+        return self.table.names[self.id]
+
+    @property
+    def definition_count(self) -> int:
+        return self.table.definition_counts[self.id]
+
+    @definition_count.setter
+    def definition_count(self, count: int):
+        self.table.definition_counts[self.id] = count
+
+    @property
+    def value(self) -> int | None:
+        value = self.table.values[self.id]
+        return None if value == NO_VALUE else value
+
+    @value.setter
+    def value(self, value: int | None):
+        if value is not None and not NO_VALUE < value < 2**31:
+            raise ValueError(f"Value of {self.name} out of range: {value}")
+        self.table.values[self.id] = NO_VALUE if value is None else value
+        self.table.versions[self.id] += 1
+
+    # Bumped on every assignment to value, so encodings which depend on the
+    # value can tell when they are stale.
+    @property
+    def version(self) -> int:
+        return self.table.versions[self.id]
 
     def is_undefined(self):
-        return self.definition_count == 0
+        return self.table.definition_counts[self.id] == 0
 
     def is_multiply_defined(self):
-        return self.definition_count > 1
+        return self.table.definition_counts[self.id] > 1
 
     def __int__(self) -> int:
-        return 0 if self.value is None else self.value
+        value = self.table.values[self.id]
+        return 0 if value == NO_VALUE else value
 
     def __str__(self):
-        return self.name
+        return self.table.names[self.id]
+
+    def __eq__(self, other: object) -> bool:
+        if type(other) is not SymbolEntry:
+            return NotImplemented
+        return self.id == other.id and self.table is other.table
+
+    def __hash__(self) -> int:
+        return hash((id(self.table), self.id))
+
+    # Unpickles as a view of the unpickled table.
+    def __reduce__(self):
+        return self.table.entry, (self.id,)
 
 
+# Symbols are numbered densely in the order they are first seen, and their
+# state lives in parallel arrays indexed by id. Code which only needs ids, such
+# as merge(), works on the arrays directly rather than through SymbolEntry.
+#
+# A table may sit over a frozen base table, e.g. OS_SYMBOLS. A base symbol is
+# copied into this table the first time it is looked up, so this table's views
+# can be written without touching the base; creating the table copies nothing.
 class SymbolTable:
-    def __init__(self) -> None:
-        self._table: Dict[str, SymbolEntry] = {}
+    def __init__(self, base: "SymbolTable | None" = None) -> None:
+        self._ids: Dict[str, int] = {}
+        self.names: List[str] = []
+        self.definition_counts: Column = array.array("I")
+        self.values: Column = array.array("i")
+        self.versions: Column = array.array("Q")
+        self._base = base
+        self.frozen = False
 
     def reference(self, name: str) -> SymbolEntry:
-        if name not in self._table:
-            self._table[name] = SymbolEntry(name)
-        return self._table[name]
+        return SymbolEntry(self, self.symbol_id(name))
+
+    def _add(self, name: str) -> int:
+        if self.frozen:
+            raise TypeError(f"Cannot add {name} to a frozen symbol table")
+        ret = self._ids[name] = len(self.names)
+        self.names.append(sys.intern(name))
+        count, value, version = 0, NO_VALUE, 0
+        if (shadowed := self._find_base(name)) is not None:
+            table, symbol_id = shadowed
+            count = table.definition_counts[symbol_id]
+            value = table.values[symbol_id]
+            version = table.versions[symbol_id]
+        # Only frozen tables hold views, and they were refused above.
+        cast(array.array, self.definition_counts).append(count)
+        cast(array.array, self.values).append(value)
+        cast(array.array, self.versions).append(version)
+        return ret
+
+    # The base table holding name, and its id there, without copying it.
+    def _find_base(self, name: str) -> "Tuple[SymbolTable, int] | None":
+        base = self._base
+        while base is not None:
+            if (symbol_id := base._ids.get(name)) is not None:
+                return base, symbol_id
+            base = base._base
+        return None
 
     def define(self, name: str) -> SymbolEntry:
-        (sym := self.reference(name)).definition_count += 1
-        return sym
+        ret = self.reference(name)
+        self.definition_counts[ret.id] += 1
+        return ret
+
+    def symbol_id(self, name: str) -> int:
+        if (ret := self._ids.get(name)) is None:
+            ret = self._add(name)
+        return ret
+
+    def entry(self, symbol_id: int) -> SymbolEntry:
+        if not 0 <= symbol_id < len(self.names):
+            raise IndexError(symbol_id)
+        return SymbolEntry(self, symbol_id)
+
+    # Add other's definition counts to this table, creating any symbols which
+    # are missing. Values are not merged. Returns the id in this table of each
+    # of other's ids.
+    def merge(self, other: "SymbolTable") -> List[int]:
+        ids = [self.symbol_id(name) for name in other.names]
+        counts = self.definition_counts
+        for other_id, count in enumerate(other.definition_counts):
+            counts[ids[other_id]] += count
+        return ids
+
+    # Make the table read-only: adding symbols raises TypeError, as does
+    # writing through its views, since the arrays become read-only memoryviews.
+    def freeze(self) -> "SymbolTable":
+        self.frozen = True
+        self.definition_counts = memoryview(self.definition_counts).toreadonly()
+        self.values = memoryview(self.values).toreadonly()
+        self.versions = memoryview(self.versions).toreadonly()
+        return self
 
     def __contains__(self, name: str) -> bool:
-        return name in self._table
+        return name in self._ids or self._find_base(name) is not None
 
-    def __getitem__(self, name: str):
-        return self._table[name]
+    def __getitem__(self, name: str) -> SymbolEntry:
+        if (ret := self._ids.get(name)) is None:
+            if self._find_base(name) is None:
+                raise KeyError(name)
+            ret = self._add(name)
+        return SymbolEntry(self, ret)
+
+    # Names, in the order they were first referenced or defined. Base symbols
+    # come first, as though they had been added before any others.
+    def __iter__(self) -> Iterator[str]:
+        if self._base is not None:
+            yield from self._base
+        for name in self.names:
+            if self._find_base(name) is None:
+                yield name
+
+    # A frozen table is shared rather than copied, so OS_SYMBOLS pickles by
+    # name, and tables over it refer to it rather than duplicating it. Other
+    # frozen tables cannot be pickled.
+    def __reduce_ex__(self, protocol):
+        if not self.frozen:
+            return super().__reduce_ex__(protocol)
+        elif self is not OS_SYMBOLS:
+            raise TypeError("Frozen symbol tables cannot be pickled")
+        return "OS_SYMBOLS"
+
+    # Only the names and arrays are serialized; ids are rebuilt from names.
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_ids"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._ids = {
+            name: symbol_id for symbol_id, name in enumerate(self.names)
+        }
 
 
 def add_OS_symbols(st: SymbolTable):
@@ -49,3 +207,9 @@ def add_OS_symbols(st: SymbolTable):
     st.define("HEXO").value = 2
     st.define("STRO").value = 3
     st.define("SNOP").value = 4
+
+
+# Shared by every assembly; use SymbolTable(OS_SYMBOLS) for a table of your own.
+OS_SYMBOLS = SymbolTable()
+add_OS_symbols(OS_SYMBOLS)
+OS_SYMBOLS.freeze()
@@ -1,56 +1,63 @@
 from dataclasses import dataclass
 
+# Tokens with a value are slotted but not frozen; a frozen dataclass assigns
+# fields through object.__setattr__, which doubles the cost of construction.
 
-@dataclass
+
+@dataclass(slots=True)
 class Identifier:
     value: str
 
 
-@dataclass
+@dataclass(slots=True)
 class Symbol:
     value: str
 
 
-@dataclass
+@dataclass(slots=True)
 class Comment:
     value: str
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Empty: ...
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Invalid: ...
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Comma: ...
 
 
-@dataclass
+@dataclass(slots=True)
 class Decimal:
     value: int
 
 
-@dataclass
+@dataclass(slots=True)
 class Hexadecimal:
     value: int
 
 
-@dataclass
+@dataclass(slots=True)
 class Dot:
     value: str
 
 
-@dataclass
+@dataclass(slots=True)
 class String:
     value: bytearray
 
 
-@dataclass
+@dataclass(slots=True)
 class Macro:
     value: str
 
 
+# Valueless tokens carry no state, so one shared instance of each suffices.
+EMPTY, INVALID, COMMA = Empty(), Invalid(), Comma()
+
+
 type Token = Empty | Invalid | Comma | Decimal | Hexadecimal | Comment | Identifier | Symbol | Dot | String | Macro
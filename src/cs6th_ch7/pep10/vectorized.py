@@ -0,0 +1,109 @@
+import array
+from typing import List, Tuple
+
+from .compact import CompactProgram, LineKind, NONE, OperandKind
+
+# NumPy is optional. Without it, code_gen keeps to its pure-Python loops.
+try:
+    import numpy as np
+
+    HAVE_NUMPY = True
+except ImportError:
+    HAVE_NUMPY = False
+
+
+def available() -> bool:
+    return HAVE_NUMPY
+
+
+_COLUMNS = (
+    "kinds",
+    "mnemonics",
+    "modes",
+    "operand_kinds",
+    "operands",
+    "symbol_decls",
+    "lengths",
+    "addresses",
+)
+
+
+# View an array.array column as an ndarray without copying it.
+def _view(column: array.array):
+    dtype = np.dtype(column.typecode)
+    return np.frombuffer(column, dtype=dtype) if column else np.empty(0, dtype)
+
+
+def _to_column(values, typecode: str) -> array.array:
+    return array.array(typecode, values.astype(typecode).tobytes())
+
+
+# CompactProgram.select, gathering each column with one fancy-index.
+def _select(program: CompactProgram, keep) -> CompactProgram:
+    ret = CompactProgram()
+    ret.symbols, ret._symbol_ids = program.symbols, program._symbol_ids
+    for name in _COLUMNS:
+        column = getattr(program, name)
+        setattr(ret, name, _to_column(_view(column)[keep], column.typecode))
+    comments = program.comments
+    ret.comments = [comments[index] for index in keep.tolist()]
+    return ret
+
+
+# code_gen.compact_addresses over whole columns at once. Addresses are an
+# exclusive cumulative sum of instruction lengths; symbol state is gathered
+# per line by symbol id. Python only visits symbols being defined, and lines
+# with an error to report, so the error list matches compact_addresses.
+def compact_addresses(
+    program: CompactProgram, base_address=0
+) -> Tuple[CompactProgram, List[str]]:
+    assert HAVE_NUMPY, "vectorized.compact_addresses requires numpy"
+    kinds = _view(program.kinds)
+    lengths = _view(program.lengths).astype(np.int64)
+    decls = _view(program.symbol_decls).astype(np.int64)
+    operands = _view(program.operands).astype(np.int64)
+    is_error = kinds == LineKind.ERROR
+    is_code = kinds >= LineKind.MONADIC
+
+    # Only instructions take up space, and only they are assigned addresses.
+    lengths[~is_code] = 0
+    starts = base_address + np.cumsum(lengths) - lengths
+    addresses = _view(program.addresses).astype(np.int64)
+    addresses[is_code] = starts[is_code]
+    program.addresses = _to_column(addresses, program.addresses.typecode)
+
+    counts = np.fromiter(
+        (symbol.definition_count for symbol in program.symbols),
+        dtype=np.int64,
+        count=len(program.symbols),
+    )
+    # Pad with one entry, so that NONE (-1) gathers a harmless value.
+    counts = np.append(counts, 1)
+    declared = is_code & (decls != NONE)
+    multiply_defined = declared & (counts[decls] > 1)
+    references = is_code & (
+        _view(program.operand_kinds) == OperandKind.IDENTIFIER
+    )
+    undefined = references & (counts[np.where(references, operands, -1)] == 0)
+
+    defines = np.flatnonzero(declared & ~multiply_defined)
+    for symbol_id, address in zip(
+        decls[defines].tolist(), addresses[defines].tolist()
+    ):
+        program.symbols[symbol_id].value = address
+
+    errors: List[str] = []
+    symbols = program.symbols
+    reported = np.flatnonzero(is_error | multiply_defined | undefined)
+    for index in reported.tolist():
+        if is_error[index]:
+            errors.append(program.source(index))
+            continue
+        elif multiply_defined[index]:
+            errors.append(f"Multiply defined symbol: {symbols[decls[index]]}")
+        if undefined[index]:
+            errors.append(f"Undefined symbol: {symbols[operands[index]]}")
+
+    if is_error.any():
+        program = _select(program, np.flatnonzero(~is_error))
+    return program, errors
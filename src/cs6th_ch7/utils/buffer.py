@@ -1,4 +1,5 @@
-from typing import List, Type, cast, Set, Protocol
+from collections import deque
+from typing import Deque, List, Type, cast, Set, Protocol, runtime_checkable
 
 
 class TokenProducer[T](Protocol):
@@ -6,22 +7,49 @@ class TokenProducer[T](Protocol):
     def __next__(self) -> T: ...
 
 
+# A producer which can discard the rest of a line without producing its
+# tokens. It must drop everything through the next end-of-line token.
+@runtime_checkable
+class LineSkipper(Protocol):
+
+    def skip_to_next_line(self) -> None: ...
+
+
 class ParserBuffer:
     def __init__(self, producer: TokenProducer):
         self._producer = producer
-        self._buffer: List = []
+        self._skipper = producer if isinstance(producer, LineSkipper) else None
+        # Tokens read from the producer but not yet consumed.
+        self._buffer: Deque = deque()
+        # Tokens consumed since the oldest outstanding mark(), so that reset()
+        # can put them back without asking the producer to re-lex them.
+        self._history: List = []
+        self._marks: List[int] = []
 
-    def peek(self):
-        if len(self._buffer) == 0:
+    # Ensure at least count tokens are pending, unless the producer runs dry.
+    def _fill(self, count: int) -> bool:
+        while len(self._buffer) < count:
             try:
                 self._buffer.append(next(self._producer))
             except StopIteration:
-                return None
-        return self._buffer[0]
+                return False
+        return True
+
+    def _take(self):
+        token = self._buffer.popleft()
+        if self._marks:
+            self._history.append(token)
+        return token
+
+    # Look k tokens past the next unconsumed one, without consuming any.
+    def peek(self, k: int = 0):
+        if len(self._buffer) > k or self._fill(k + 1):
+            return self._buffer[k]
+        return None
 
     def may_match(self, expected_type):
         if (token := self.peek()) and type(token) is expected_type:
-            return self._buffer.pop(0)
+            return self._take()
         return None
 
     def must_match(self, expected_type):
@@ -29,14 +57,40 @@ class ParserBuffer:
             return ret
         raise SyntaxError()
 
+    # Consume the token returned by the last peek().
+    def advance(self):
+        self._take()
+
     def push(self, value):
         self._buffer.append(value)
 
+    # Remember the current position. Every mark() must be paired with either
+    # reset(), which rewinds to the position, or release(), which keeps the
+    # tokens consumed since. Marks nest.
+    def mark(self):
+        self._marks.append(len(self._history))
+
+    def reset(self):
+        start = self._marks.pop()
+        self._buffer.extendleft(reversed(self._history[start:]))
+        del self._history[start:]
+
+    def release(self):
+        self._marks.pop()
+        if not self._marks:
+            self._history.clear()
+
     def skip_to_next_line[T](self, eol_markers: Set[T]):
+        while self._buffer:
+            if type(self._take()) in eol_markers:
+                return
+        # Tokens skipped while marked must be kept for reset().
+        if self._skipper and not self._marks:
+            return self._skipper.skip_to_next_line()
         while (
             type(token := self.peek()) not in eol_markers and token is not None
         ):
-            self._buffer.pop(0)
+            self._take()
         # Consume trailing EOL, so we can begin parsing on the next line
         if len(self._buffer) and type(self._buffer[0]) in eol_markers:
-            self._buffer.pop(0)
+            self._take()
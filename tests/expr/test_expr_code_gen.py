@@ -0,0 +1,257 @@
+import io
+import random
+from typing import Dict, List, Tuple
+
+import pytest
+
+from cs6th_ch7.expr.code_gen import expression_string, to_pep10_ir
+from cs6th_ch7.expr.optimize import constant_products, fold_constants
+from cs6th_ch7.expr.optimize import share_subexpressions, signed
+from cs6th_ch7.expr.parser import IterativeExpressionParser
+from cs6th_ch7.pep10.code_gen import calculate_addresses
+from cs6th_ch7.pep10.mnemonics import AddressingMode as AM
+
+
+def parse(text: str):
+    return IterativeExpressionParser(io.StringIO(text + "\n")).E()
+
+
+# Run a program from to_pep10_ir, returning the numbers it prints, the number
+# of instructions executed, and its size in bytes. Only the instructions the
+# generator uses are modelled, and only the flags it branches on.
+def run(text: str, **options) -> Tuple[List[int], int, int]:
+    program, errors = calculate_addresses(to_pep10_ir(parse(text), **options))
+    assert errors == []
+    lines = {line.memory_address: line for line in program}
+    size = sum(len(line) for line in lines.values())
+    memory: Dict[int, int] = {}
+    a = x = 0
+    sp, pc, calls, steps, output = 0xFB8F, 0, 0, 0, []
+    zero = carry = False
+    while True:
+        line = lines[pc]
+        pc += len(line)
+        steps += 1
+        assert steps < 100_000, "Program did not finish"
+        mnemonic = line.mnemonic
+        if (operand := getattr(line, "operand_spec", None)) is not None:
+            operand = int(operand) & 0xFFFF
+        address = value = 0
+        if getattr(line, "addressing_mode", None) is AM.I:
+            value = operand
+        elif operand is not None:
+            address = (sp + operand) & 0xFFFF
+            value = memory.get(address, 0)
+        match mnemonic:
+            case "SUBSP":
+                sp = (sp - value) & 0xFFFF
+            case "ADDSP":
+                sp = (sp + value) & 0xFFFF
+            case "LDWA":
+                a = value
+            case "LDWX":
+                x = value
+            case "STWA":
+                memory[address] = a
+            case "STWX":
+                memory[address] = x
+            case "ADDA":
+                a = (a + value) & 0xFFFF
+            case "ADDX":
+                x = (x + value) & 0xFFFF
+            case "ANDX":
+                x &= value
+            case "ASLA":
+                a = (a << 1) & 0xFFFF
+            case "ASLX":
+                x = (x << 1) & 0xFFFF
+            case "ASRX":
+                x = (x >> 1) | (x & 0x8000)
+            case "BR":
+                pc = value
+            case "CPWA":
+                carry = a >= value
+            case "BREQ":
+                pc = value if zero else pc
+            case "BRC":
+                pc = value if carry else pc
+            case "CALL":
+                calls += 1
+                sp = (sp - 2) & 0xFFFF
+                memory[sp] = pc
+                pc = value
+            case "RET":
+                if calls == 0:
+                    return output, steps, size
+                calls -= 1
+                pc = memory[sp]
+                sp = (sp + 2) & 0xFFFF
+            case "SCALL":
+                assert a == 1, "Only DECO is modelled"
+                output.append(signed(value))
+        if mnemonic in ("LDWX", "ADDX", "ANDX", "ASLX", "ASRX"):
+            zero = x == 0
+        elif mnemonic in ("LDWA", "ADDA", "ASLA"):
+            zero = a == 0
+
+
+EXPRESSIONS = [
+    "7",
+    "-3",
+    "1 + 2 * 3",
+    "(1 + 2) * (1 + 2)",
+    "200 * 300 + 1",
+    "-2 * 3 + (-2 * 3) * 4",
+    "((2 + 3) * (2 + 3)) + ((2 + 3) * (2 + 3)) * 5",
+    "(1 + 2) * 0 + 1 * (3 + 4) + (5 + 6) * 10 + 100 * (7 + 8)",
+    "(1 + 2) * (3 + 4) * -1",
+]
+
+
+@pytest.mark.parametrize("text", EXPRESSIONS)
+@pytest.mark.parametrize(
+    "options",
+    [
+        {"fold": True},
+        {"share": True},
+        {"reduce": True},
+        {"cache": True},
+        {"share": True, "reduce": True, "cache": True},
+        {"fold": True, "share": True, "reduce": True, "cache": True},
+    ],
+)
+def test_optimized_output_matches(text, options) -> None:
+    expected, steps, size = run(text)
+    actual, optimized_steps, optimized_size = run(text, **options)
+    assert actual == expected
+    assert optimized_steps <= steps
+    assert optimized_size <= size
+
+
+def test_fold_constants() -> None:
+    assert expression_string(fold_constants(parse("1 + 2 * 3"))) == "7"
+    # Products wrap to 16 bits, as the program computes them.
+    assert expression_string(fold_constants(parse("256 * 256 + 1"))) == "1"
+    assert expression_string(fold_constants(parse("200 * 200"))) == "-25536"
+    assert expression_string(fold_constants(parse("-2 * 3"))) == "-6"
+    # times never returns if both operands are negative, so it is kept.
+    folded = fold_constants(parse("2 * (0 + -3) * (4 + -5)"))
+    assert expression_string(folded) == "2 -3 -1 * *"
+
+
+def test_share_subexpressions() -> None:
+    shared = share_subexpressions(parse("(1 + 2) * (1 + 2) + (1 + 2) * 3"))
+    assert expression_string(shared) == "1 2 + t0 t0 * t0 3 * +"
+    nested = share_subexpressions(parse("(2 * (1 + 2)) + (2 * (1 + 2))"))
+    assert expression_string(nested) == "2 1 2 + * t0 t0 +"
+    # Constants alone are never worth a temporary.
+    assert expression_string(share_subexpressions(parse("1 + 1"))) == "1 1 +"
+
+
+def test_optimized_random_expressions() -> None:
+    rng = random.Random(6)
+    for _ in range(50):
+        terms = [str(rng.randint(0, 20)) for _ in range(rng.randint(1, 8))]
+        text = terms[0]
+        for term in terms[1:]:
+            text = f"({text}) {rng.choice('+*')} {term}"
+        expected, steps, _ = run(text)
+        for options in [
+            {"fold": True, "share": True, "reduce": True},
+            {"share": True, "reduce": True, "cache": True},
+        ]:
+            actual, optimized_steps, _ = run(text, **options)
+            assert actual == expected
+            assert optimized_steps <= steps
+
+
+def test_constant_products() -> None:
+    expression = parse("(1 + 2) * 10 + 3 * (4 + 5) + (6 + 7) * -1")
+    products, skipped = constant_products(expression)
+    # The -1 is left to times, which would loop over every bit of it.
+    assert sorted(products.values()) == [3, 10]
+    assert sorted(expression[index].value for index in skipped) == [3, 10]
+
+    # Multiplication by 10 is two shifts, an add and a shift.
+    _, steps, _ = run("(1 + 2) * 10", reduce=True)
+    _, unreduced, _ = run("(1 + 2) * 10")
+    assert steps < unreduced / 3
+
+
+def test_reduce_is_never_worse() -> None:
+    rng = random.Random(24)
+    # 4097 is only just cheap enough to multiply inline; 31 and 8193 are not.
+    # With the stack cached, 513 only just is and 1025 is not.
+    multipliers = [0, 1, 3, 10, 100, 4097, 31, 8193, 255, 1000, 32767]
+    multipliers += [513, 1025]
+    for _ in range(100):
+        # A product times is still called for, so leaving it out does not
+        # make up for inlining a constant which costs more than a call.
+        terms = ["(1 + 2) * (3 + 4)"]
+        for _ in range(rng.randint(1, 3)):
+            # Multiplying by 0 is where times is cheapest.
+            operand = rng.choice(["(0 + 0)", f"(1 + {rng.randint(0, 40)})"])
+            constant = rng.choice(multipliers + [rng.randint(0, 32767)])
+            terms.append(
+                rng.choice(
+                    [f"{operand} * {constant}", f"{constant} * {operand}"]
+                )
+            )
+        text = " + ".join(terms)
+        for cache in (False, True):
+            expected, steps, size = run(text, cache=cache)
+            actual, reduced_steps, reduced_size = run(
+                text, cache=cache, reduce=True
+            )
+            assert actual == expected
+            assert reduced_steps <= steps, text
+            assert reduced_size <= size, text
+
+
+def test_cache_is_never_worse() -> None:
+    rng = random.Random(25)
+    # Products alone gain nothing from sums being inline.
+    texts = ["7 * (1 * 0)", "3 * (10 * 1000)"]
+    for _ in range(200):
+        operands = [str(rng.randint(0, 20)) for _ in range(rng.randint(1, 8))]
+        while len(operands) > 1:
+            index = rng.randrange(len(operands) - 1)
+            operator = rng.choice("**+")
+            right = operands.pop(index + 1)
+            operands[index] = f"({operands[index]} {operator} {right})"
+        texts.append(operands[0])
+    for text in texts:
+        for options in [{}, {"share": True}, {"reduce": True}]:
+            expected, steps, size = run(text, **options)
+            actual, cached_steps, cached_size = run(text, cache=True, **options)
+            assert actual == expected
+            assert cached_steps <= steps, text
+            assert cached_size <= size, text
+
+
+def test_times_loops_over_smaller_operand() -> None:
+    small_right, steps, _ = run("(0 + 1000) * (0 + 3)")
+    small_left, swapped_steps, _ = run("(0 + 3) * (0 + 1000)")
+    assert small_left == small_right == [3000]
+    assert swapped_steps == steps + 3
+    # A negative operand no longer stops times from returning.
+    assert run("(0 + -7) * (0 + 6)")[0] == run("(0 + 6) * (0 + -7)")[0] == [-42]
+
+
+def test_cached_sums_are_inline() -> None:
+    text = "1 + (2 + 3) + ((4 + 5) + (6 + 7))"
+    expected, steps, _ = run(text)
+    actual, cached_steps, _ = run(text, cache=True)
+    assert actual == expected == [28]
+    assert cached_steps < steps / 3
+    program = to_pep10_ir(parse(text), cache=True)
+    assert all(line.mnemonic != "CALL" for line in program)
+
+
+def test_cached_temporaries() -> None:
+    # Temporaries are copied both from memory and from under the cache.
+    text = "((1 + 2) * (3 + 4)) * ((1 + 2) * (3 + 4)) + (1 + 2) * 5"
+    expected, steps, _ = run(text)
+    actual, cached_steps, _ = run(text, share=True, cache=True)
+    assert actual == expected
+    assert cached_steps < steps
@@ -0,0 +1,53 @@
+import io
+
+import pytest
+
+from cs6th_ch7.expr.lexer import Lexer
+from cs6th_ch7.expr.parser import ExpressionParser, IterativeExpressionParser
+from cs6th_ch7.expr.regex_lexer import RegexLexer
+import cs6th_ch7.expr.tokens as tokens
+
+TEXTS = [
+    "",
+    "1 + 2 * (3 + 4)\n",
+    "-5*007 + -0\n\n",
+    "12a - x -\n3",
+    "(1)  \t",
+    "-",
+    "٣ + 1\n",
+]
+
+
+@pytest.mark.parametrize("text", TEXTS)
+def test_regex_lexer_matches_lexer(text) -> None:
+    expected = list(Lexer(io.StringIO(text)))
+    assert list(RegexLexer(io.StringIO(text))) == expected
+    lexer, actual = RegexLexer(io.StringIO(text)), []
+    for _ in expected:
+        actual.append(next(lexer))
+    assert actual == expected
+    with pytest.raises(StopIteration):
+        next(lexer)
+
+
+def test_regex_lexer_tokens() -> None:
+    ret = list(RegexLexer(io.StringIO("(12 + -3) * x -\n")))
+    assert ret == [
+        tokens.ParenOpen(),
+        tokens.Decimal(12),
+        tokens.Plus(),
+        tokens.Decimal(-3),
+        tokens.ParenClose(),
+        tokens.Times(),
+        tokens.Invalid(),
+        tokens.Invalid(),
+    ]
+
+
+@pytest.mark.parametrize(
+    "parser_type", [ExpressionParser, IterativeExpressionParser]
+)
+def test_parse_with_regex_lexer(parser_type) -> None:
+    text = "1 * 2 + (3 + 4) * 5\n"
+    expected = parser_type(io.StringIO(text)).E()
+    assert parser_type(io.StringIO(text), RegexLexer).E() == expected
@@ -0,0 +1,48 @@
+import io
+
+import pytest
+
+from cs6th_ch7.expr.code_gen import expression_string
+from cs6th_ch7.expr.parser import ExpressionParser, IterativeExpressionParser
+
+EXPRESSIONS = [
+    "7",
+    "-3",
+    "1 + 2 + 3",
+    "1 * 2 + 3 * 4 + 5",
+    "1 + 2 * (3 + 4) * 5",
+    "((1)) * (2 + (3 * 4))",
+    "1 2",
+]
+
+
+@pytest.mark.parametrize("text", EXPRESSIONS)
+def test_iterative_matches_recursive(text) -> None:
+    expected = ExpressionParser(io.StringIO(text + "\n")).E()
+    actual = IterativeExpressionParser(io.StringIO(text + "\n")).E()
+    assert actual == expected
+
+
+@pytest.mark.parametrize(
+    "parser_type", [ExpressionParser, IterativeExpressionParser]
+)
+@pytest.mark.parametrize("text", ["", "1 +", "(1 + 2", "1 * ()", "+ 1"])
+def test_syntax_errors(parser_type, text) -> None:
+    with pytest.raises(SyntaxError):
+        parser_type(io.StringIO(text + "\n")).E()
+
+
+def test_iterative_long_expressions() -> None:
+    # Far deeper than the recursive parser can go.
+    terms = 20_000
+    text = " + ".join(["2 * 3"] * terms) + "\n"
+    ret = IterativeExpressionParser(io.StringIO(text)).E()
+    assert len(ret) == 4 * terms - 1
+    assert expression_string(ret[:6]) == "2 3 * 2 3 *"
+    assert expression_string(ret[-3:]) == "+ + +"
+
+    text = "(" * terms + "1" + ")" * terms + "\n"
+    assert (
+        expression_string(IterativeExpressionParser(io.StringIO(text)).E())
+        == "1"
+    )
@@ -0,0 +1,57 @@
+from enum import IntEnum
+
+import pytest
+
+from cs6th_ch7.fsm.dfa import compile_dfa
+
+
+class States(IntEnum):
+    I, F, M, ACCEPT, REJECT = range(5)
+
+
+class Kind(IntEnum):
+    Sign, Digit, End, Other = range(4)
+
+
+def classify(ch: str) -> Kind:
+    if ch in "+-":
+        return Kind.Sign
+    elif ch.isdigit():
+        return Kind.Digit
+    return Kind.End if ch == "\n" else Kind.Other
+
+
+def run(text: str) -> bool:
+    dfa = compile_dfa(
+        States,
+        Kind,
+        classify,
+        {
+            States.I: {Kind.Sign: States.F, Kind.Digit: States.M},
+            States.F: {Kind.Digit: States.M},
+            States.M: {Kind.Digit: States.M, Kind.End: States.ACCEPT},
+        },
+        States.I,
+        States.REJECT,
+        {States.ACCEPT: False, States.REJECT: False},
+    )
+    row = dfa.start
+    for ch in (text + "\n").encode():
+        row = dfa.transitions[row + dfa.classes[ch]]
+        if row >= dfa.first_final:
+            break
+    return row // dfa.stride == States.ACCEPT
+
+
+def test_dfa():
+    assert run("10")
+    assert run("-115")
+    assert not run("--0")
+    assert not run("+")
+    assert not run("1a")
+
+
+def test_final_states_numbered_last():
+    with pytest.raises(ValueError):
+        final = {States.F: False}
+        compile_dfa(States, Kind, classify, {}, States.I, States.F, final)
@@ -1,5 +1,10 @@
+import io
+
 import pytest
 from cs6th_ch7.pep10.code_gen import program_object_code, calculate_addresses
+from cs6th_ch7.pep10.code_gen import emit_program, program_listing
+from cs6th_ch7.pep10.code_gen import program_source
+from cs6th_ch7.pep10.compact import CompactProgram
 from cs6th_ch7.pep10.ir import CommentLine, EmptyLine
 from cs6th_ch7.pep10.parser import parse
 from cs6th_ch7.pep10.symbol import SymbolTable
@@ -43,3 +48,19 @@ def test_comment_empty():
     assert len(parse_tree) == 2 and len(ir) == 2
     assert program_object_code(ir) == bytearray()
     assert type(ir[0]) is EmptyLine and type(ir[1]) is CommentLine
+
+
+def test_undefined_symbol():
+    ir, errors = calculate_addresses(parse("cat: BR dog,i\nCALL cat,i\n"))
+    assert errors == ["Undefined symbol: dog"]
+
+
+def test_emit_program():
+    text = "cat: BR 3,i ;c\n\n;x\ndog: ADDA 0x10,d\nSTWA -1,sfx\nRET\n"
+    for program in (parse(text), CompactProgram(parse(text))):
+        ir, errors = calculate_addresses(program)
+        listing_out, source_out = io.StringIO(), io.StringIO()
+        code = emit_program(ir, listing_out, source_out)
+        assert code == program_object_code(ir)
+        assert listing_out.getvalue().splitlines() == program_listing(ir)
+        assert source_out.getvalue().splitlines() == program_source(ir)
@@ -0,0 +1,42 @@
+from io import StringIO
+
+import pytest
+
+from cs6th_ch7.pep10.columnar import Kind, tokenize_columns
+from cs6th_ch7.pep10.lexer import Lexer
+from cs6th_ch7.pep10.parser import Parser, parse
+from cs6th_ch7.pep10.regex_lexer import RegexLexer
+import cs6th_ch7.pep10.tokens as tokens
+
+
+def test_columns():
+    columns = tokenize_columns("cat: ADDA 0x10,i ;hi\n")
+    assert list(columns.kinds) == [
+        Kind.SYMBOL,
+        Kind.IDENTIFIER,
+        Kind.HEXADECIMAL,
+        Kind.COMMA,
+        Kind.IDENTIFIER,
+        Kind.COMMENT,
+        Kind.EMPTY,
+    ]
+    assert columns.text(0) == "cat"
+    assert columns.text(2) == "10" and columns.values[2] == 0x10
+    assert columns.text(5) == "hi"
+    assert columns.token(5) == tokens.Comment("hi")
+
+
+def test_columns_match_lexer():
+    text = "a: -5 0x 99999999999999999999 @\n é:1 ١٢ 00x1\n;ü\n  "
+    columns = tokenize_columns(text)
+    expected = list(Lexer(StringIO(text)))
+    assert [columns.token(i) for i in range(len(columns))] == expected
+
+
+def test_columnar_parse():
+    text = "cat: BR 0x10,x ;c\n\nADDA -5,sfx\nNOPN HELLO: -\nRET\n;x\nBR cat,i"
+    expected = [repr(line) for line in parse(text)]
+    assert [repr(line) for line in parse(text, columnar=True)] == expected
+    assert Parser(StringIO(text), columnar=True).lexer is None
+    with pytest.raises(ValueError):
+        parse(text, lexer_type=RegexLexer, columnar=True)
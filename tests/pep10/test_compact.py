@@ -0,0 +1,54 @@
+from io import StringIO
+
+from cs6th_ch7.pep10.code_gen import calculate_addresses, program_listing
+from cs6th_ch7.pep10.code_gen import program_object_code, program_source
+from cs6th_ch7.pep10.compact import CompactProgram, LineKind
+from cs6th_ch7.pep10.ir import ErrorLine
+from cs6th_ch7.pep10.parser import Parser, parse
+from cs6th_ch7.pep10.symbol import SymbolTable
+
+PROGRAM = """\
+cat: BR 3,i ;skip
+dog: ADDA 0x10,d
+
+;comment
+CALL dog,x
+STBX -1,sfx
+"""
+
+
+def test_compact_round_trip():
+    lines = parse(PROGRAM)
+    program = CompactProgram(lines)
+    assert len(program) == len(lines)
+    assert program.kinds[2] == LineKind.EMPTY
+    assert program.kinds[3] == LineKind.COMMENT
+    assert [repr(line) for line in program] == [repr(line) for line in lines]
+
+
+def test_compact_code_gen():
+    expected, expected_errors = calculate_addresses(parse(PROGRAM))
+    program = CompactProgram(Parser(StringIO(PROGRAM)))
+    ir, errors = calculate_addresses(program)
+    assert errors == expected_errors == []
+    assert ir is program
+    assert list(program.addresses) == [0, 3, -1, -1, 6, 9]
+    assert program_object_code(ir) == program_object_code(expected)
+    assert program_listing(ir) == program_listing(expected)
+    assert program_source(ir) == program_source(expected)
+
+
+def test_compact_errors():
+    text = "cat: LDWA 1,i\ncat: LDWA 2,i\nFOO 3,i\nBR dog,i\n"
+    expected, expected_errors = calculate_addresses(parse(text))
+    program = CompactProgram(parse(text, SymbolTable()))
+    ir, errors = calculate_addresses(program)
+    assert errors == expected_errors
+    assert errors == [
+        "Multiply defined symbol: cat",
+        "Multiply defined symbol: cat",
+        ";ERROR: Unrecognized mnemonic: FOO",
+        "Undefined symbol: dog",
+    ]
+    assert len(ir) == 3 and not any(type(line) is ErrorLine for line in ir)
+    assert [repr(line) for line in ir] == [repr(line) for line in expected]
@@ -0,0 +1,46 @@
+from cs6th_ch7.pep10.code_gen import program_object_code, calculate_addresses
+from cs6th_ch7.pep10.disassembler import DECODE, disassemble
+from cs6th_ch7.pep10.ir import DyadicLine, ErrorLine, MonadicLine
+from cs6th_ch7.pep10.mnemonics import AddressingMode
+from cs6th_ch7.pep10.parser import parse
+
+
+def test_decode_table():
+    assert DECODE[0x00] is None
+    assert DECODE[0x01] == ("RET", 1, None)
+    assert DECODE[0x1E] == ("NOTA", 1, None)
+    assert DECODE[0x37] == ("CALL", 3, AddressingMode.X)
+    assert DECODE[0xC4] == ("LDWA", 3, AddressingMode.SF)
+
+
+def test_disassemble():
+    ir = list(disassemble(bytes([0x1E, 0x51, 0x00, 0x10, 0x01]), 0x100))
+    assert [type(line) for line in ir] == [MonadicLine, DyadicLine, MonadicLine]
+    assert [line.memory_address for line in ir] == [0x100, 0x101, 0x104]
+    assert (
+        ir[1].source()
+        == DyadicLine("ADDA", ir[1].operand_spec, AddressingMode.D).source()
+    )
+    assert int(ir[1].operand_spec) == 0x10
+
+
+def test_disassemble_errors():
+    ir = list(disassemble(bytes([0x00, 0x01, 0x24, 0x00])))
+    assert [type(line) for line in ir] == [ErrorLine, MonadicLine, ErrorLine]
+    assert ir[0].comment == "Illegal opcode: 0x00"
+    assert ir[2].comment == "Truncated instruction: BR"
+
+
+def test_round_trip():
+    parse_tree = parse("cat:BR 3,i\ndog:ADDA 0x10,d\nCALL dog,x\nSTBX -1,sfx\n")
+    ir, errors = calculate_addresses(parse_tree)
+    assert len(errors) == 0
+    object_code = program_object_code(ir)
+    assert program_object_code(list(disassemble(object_code))) == object_code
+
+    every_opcode = bytearray()
+    for opcode, decoding in enumerate(DECODE):
+        if decoding:
+            every_opcode += bytes([opcode, 0xFE, 0xED][: decoding[1]])
+    decoded = list(disassemble(memoryview(every_opcode)))
+    assert program_object_code(decoded) == every_opcode
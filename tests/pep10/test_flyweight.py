@@ -0,0 +1,46 @@
+import pytest
+
+from cs6th_ch7.pep10.code_gen import calculate_addresses, program_listing
+from cs6th_ch7.pep10.code_gen import program_object_code
+from cs6th_ch7.pep10.flyweight import Flyweights, PlacedLine
+from cs6th_ch7.pep10.ir import DyadicLine, GeneratesObjectCode, MonadicLine
+from cs6th_ch7.pep10.mnemonics import AddressingMode as AM
+from cs6th_ch7.pep10.operands import Decimal, Identifier
+from cs6th_ch7.pep10.symbol import SymbolTable
+
+
+def test_interning():
+    pool = Flyweights()
+    assert pool.decimal(0) is pool.decimal(0)
+    assert pool.decimal(16) is not pool.hexadecimal(16)
+    first = pool.line("STWA", pool.decimal(0), AM.S)
+    second = pool.line("stwa", Decimal(0), AM.S)
+    assert first is not second and first.template is second.template
+    assert pool.line("RET").template is pool.template("RET")
+    assert isinstance(first, GeneratesObjectCode)
+    with pytest.raises(ValueError):
+        pool.template("STWA", pool.decimal(0))
+    with pytest.raises(ValueError):
+        pool.line("STWA", addressing_mode=AM.S)
+
+
+def test_placed_lines_match_ir():
+    st, pool = SymbolTable(), Flyweights()
+    loop, done = st.define("loop"), st.reference("done")
+    lines = [
+        DyadicLine("LDWA", Decimal(0), AM.S, symbol_decl=loop, comment="c"),
+        DyadicLine("BREQ", Identifier(done), AM.I),
+        DyadicLine("LDWA", Decimal(0), AM.S),
+        MonadicLine("RET", symbol_decl=st.define("done")),
+    ]
+    placed = [pool.place(line) for line in lines]
+    assert placed[0].template is placed[2].template
+    assert [repr(line) for line in placed] == [repr(line) for line in lines]
+
+    expected, expected_errors = calculate_addresses(lines)
+    ir, errors = calculate_addresses(placed)
+    assert errors == expected_errors == []
+    assert [line.memory_address for line in placed] == [0, 3, 6, 9]
+    assert placed[0].template.memory_address is None
+    assert program_listing(ir) == program_listing(expected)
+    assert program_object_code(ir) == program_object_code(expected)
@@ -1,5 +1,5 @@
 import pytest, typing
-from cs6th_ch7.pep10.operands import Decimal
+from cs6th_ch7.pep10.operands import Decimal, Identifier
 from cs6th_ch7.pep10.ir import listing, DyadicLine, MonadicLine
 from cs6th_ch7.pep10.mnemonics import AddressingMode
 from cs6th_ch7.pep10.symbol import SymbolTable
@@ -46,3 +46,23 @@ def test_nonunary():
         "".join(listing(i)).rstrip()
         == "0000 56000A        ADDA   10,sx       ;hi"
     )
+
+
+def test_object_code_cache():
+    st = SymbolTable()
+    cat = st.define("cat")
+    operand = Decimal(10)
+    i = DyadicLine("ADDA", operand, AddressingMode.I)
+    code = i.object_code()
+    assert code == bytes([0x50, 0x00, 0x0A]) and i.object_code() is code
+    operand.value = 11
+    assert i.object_code() == bytes([0x50, 0x00, 0x0B])
+    i.addressing_mode = AddressingMode.D
+    assert i.object_code() == bytes([0x51, 0x00, 0x0B])
+
+    i = DyadicLine("BR", Identifier(cat), AddressingMode.I)
+    assert i.object_code() == bytes([0x24, 0x00, 0x00])
+    code = i.object_code()
+    assert i.object_code() is code
+    cat.value = 0x1234
+    assert i.object_code() == bytes([0x24, 0x12, 0x34])
@@ -3,32 +3,40 @@ from io import StringIO
 import pytest
 
 from cs6th_ch7.pep10.lexer import Lexer
+from cs6th_ch7.pep10.regex_lexer import RegexLexer
+from cs6th_ch7.pep10.dfa_lexer import DFALexer
+from cs6th_ch7.pep10.mapped_lexer import MappedLexer
 import cs6th_ch7.pep10.tokens as tokens
 
 
-def test_lexer_empty():
-    tk = Lexer(StringIO("   \n  "))
+@pytest.fixture(params=[Lexer, RegexLexer, DFALexer])
+def lexer_type(request):
+    return request.param
+
+
+def test_lexer_empty(lexer_type):
+    tk = lexer_type(StringIO("   \n  "))
     assert type(tok := next(tk)) is tokens.Empty
     assert type(tok := next(tk)) is tokens.Empty
 
 
-def test_lexer_comma():
-    tk = Lexer(StringIO("   ,\n,  "))
+def test_lexer_comma(lexer_type):
+    tk = lexer_type(StringIO("   ,\n,  "))
     assert type(tok := next(tk)) is tokens.Comma
     assert type(tok := next(tk)) is tokens.Empty
     assert type(tok := next(tk)) is tokens.Comma
     assert type(tok := next(tk)) is tokens.Empty
 
 
-def test_lexer_comment():
-    tk = Lexer(StringIO(" ;Comment here\n"))
+def test_lexer_comment(lexer_type):
+    tk = lexer_type(StringIO(" ;Comment here\n"))
     assert type(tok := next(tk)) is tokens.Comment
     assert tok.value == "Comment here"
     assert type(tok := next(tk)) is tokens.Empty
 
 
-def test_lexer_identifier():
-    tk = Lexer(StringIO("a bCd b0 b9 a_word "))
+def test_lexer_identifier(lexer_type):
+    tk = lexer_type(StringIO("a bCd b0 b9 a_word "))
     assert type(tok := next(tk)) == tokens.Identifier
     assert tok.value == "a"
     assert type(tok := next(tk)) == tokens.Identifier
@@ -41,8 +49,8 @@ def test_lexer_identifier():
     assert tok.value == "a_word"
 
 
-def test_lexer_symbol():
-    tk = Lexer(StringIO("a: bCd: b0: b9: a_word: "))
+def test_lexer_symbol(lexer_type):
+    tk = lexer_type(StringIO("a: bCd: b0: b9: a_word: "))
     assert type(tok := next(tk)) is tokens.Symbol
     assert tok.value == "a"
     assert type(tok := next(tk)) is tokens.Symbol
@@ -55,8 +63,8 @@ def test_lexer_symbol():
     assert tok.value == "a_word"
 
 
-def test_lexer_unsigned_decimal():
-    tk = Lexer(StringIO("0 00 000 10 65537 "))
+def test_lexer_unsigned_decimal(lexer_type):
+    tk = lexer_type(StringIO("0 00 000 10 65537 "))
     assert type(tok := next(tk)) is tokens.Decimal
     assert tok.value == 0
     assert type(tok := next(tk)) is tokens.Decimal
@@ -69,8 +77,8 @@ def test_lexer_unsigned_decimal():
     assert tok.value == 65537
 
 
-def test_lexer_positive_decimal():
-    tk = Lexer(StringIO("+0 +00 +000 +10 +65537 "))
+def test_lexer_positive_decimal(lexer_type):
+    tk = lexer_type(StringIO("+0 +00 +000 +10 +65537 "))
     assert type(tok := next(tk)) is tokens.Decimal
     assert tok.value == 0
     assert type(tok := next(tk)) is tokens.Decimal
@@ -83,8 +91,8 @@ def test_lexer_positive_decimal():
     assert tok.value == 65537
 
 
-def test_lexer_negative_decimal():
-    tk = Lexer(StringIO("-0 -00 -000 -10 -65537 "))
+def test_lexer_negative_decimal(lexer_type):
+    tk = lexer_type(StringIO("-0 -00 -000 -10 -65537 "))
     assert type(tok := next(tk)) is tokens.Decimal
     assert tok.value == 0
     assert type(tok := next(tk)) is tokens.Decimal
@@ -97,13 +105,13 @@ def test_lexer_negative_decimal():
     assert tok.value == -65537
 
 
-def test_lexer_sign_needs_digit():
-    tk = Lexer(StringIO("- "))
+def test_lexer_sign_needs_digit(lexer_type):
+    tk = lexer_type(StringIO("- "))
     assert type(next(tk)) is tokens.Invalid
 
 
-def test_lexer_hexadecimal():
-    tk = Lexer(StringIO("0x0 0X000  0x1 0x10 0x10000 "))
+def test_lexer_hexadecimal(lexer_type):
+    tk = lexer_type(StringIO("0x0 0X000  0x1 0x10 0x10000 "))
     assert type(tok := next(tk)) is tokens.Hexadecimal
     assert tok.value == 0x0
     assert type(tok := next(tk)) is tokens.Hexadecimal
@@ -116,8 +124,8 @@ def test_lexer_hexadecimal():
     assert tok.value == 0x1_00_00
 
 
-def test_lexer_hex_needs_digit():
-    tk = Lexer(StringIO("0x "))
+def test_lexer_hex_needs_digit(lexer_type):
+    tk = lexer_type(StringIO("0x "))
     assert type(next(tk)) is tokens.Invalid
 
 
@@ -161,5 +169,64 @@ def test_lexer_unescaped_string():
     assert tok.value == b"'"
 
 
+def test_lexer_invalid_consumes_newline(lexer_type):
+    tk = lexer_type(StringIO("- \n0x\n+\n0xg,"))
+    assert type(next(tk)) is tokens.Invalid
+    assert type(next(tk)) is tokens.Empty
+    assert type(next(tk)) is tokens.Invalid
+    assert type(next(tk)) is tokens.Invalid
+    assert type(next(tk)) is tokens.Invalid
+    assert type(next(tk)) is tokens.Comma
+    with pytest.raises(StopIteration):
+        next(tk)
+
+
+def test_lexer_trailing_whitespace(lexer_type):
+    assert [type(t) for t in lexer_type(StringIO("a"))] == [tokens.Identifier]
+    tk = lexer_type(StringIO("a \t"))
+    assert [type(t) for t in tk] == [tokens.Identifier, tokens.Empty]
+
+
+def test_lexer_skip_to_next_line(lexer_type):
+    tk = lexer_type(StringIO("a b ;c\nd 0x\ne\nf -\ng\nh max\ni"))
+    assert next(tk) == tokens.Identifier("a")
+    tk.skip_to_next_line()
+    assert next(tk) == tokens.Identifier("d")
+    # A dangling hex prefix or sign swallows the newline, skipping a line.
+    tk.skip_to_next_line()
+    assert next(tk) == tokens.Identifier("f")
+    tk.skip_to_next_line()
+    assert next(tk) == tokens.Identifier("h")
+    tk.skip_to_next_line()
+    assert next(tk) == tokens.Identifier("i")
+    tk.skip_to_next_line()
+    with pytest.raises(StopIteration):
+        next(tk)
+
+
+@pytest.mark.parametrize("engine", [RegexLexer, DFALexer])
+def test_line_lexers_match_lexer(engine):
+    text = "cat: LDWA 0x00FF,i ;hi\n\n  BR -12,x\n@ 00x1 +0 é:1 ١٢\n 0X,a"
+    assert list(engine(StringIO(text))) == list(Lexer(StringIO(text)))
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "",
+        "cat: LDWA 0x00FF,i ;hi\n\n  BR -12,x\n\n \t\n",
+        "@ 00x1 +0 é:1 ١٢\n 0X,a ;ü",
+        "ADDA 1,i\nx -",
+        "ADDA 0x",
+        "ADDA 1,i\u3000\n\u3000",
+    ],
+)
+def test_mapped_lexer_matches_parse_input(text):
+    expected = list(Lexer(StringIO(text.rstrip() + "\n")))
+    data = text.encode()
+    assert list(MappedLexer(data)) == expected
+    assert list(MappedLexer(memoryview(data))) == expected
+
+
 # TODO: test that characters are correctly rejected during lexing
 # TODO: test that strings with escape characters do not crash
@@ -1,6 +1,8 @@
 import pytest
 
 from cs6th_ch7.pep10.mnemonics import AddressingMode, InstructionType, as_int
+from cs6th_ch7.pep10.mnemonics import INVALID_OPCODE, LEGAL_MODES, MNEMONIC_IDS
+from cs6th_ch7.pep10.mnemonics import MODE_COUNT, OPCODES
 
 
 def test_AAA_bit_patterns():
@@ -41,3 +43,25 @@ def test_A_mnemonics():
     assert as_int("call") == 0x36
     assert as_int("call", am=AddressingMode.I) == 0x36
     assert as_int("call", am=AddressingMode.X) == 0x37
+    with pytest.raises(TypeError):
+        as_int("call", am=AddressingMode.SFX)
+
+
+def test_encoding_tables():
+    def opcode(mnemonic: str, am: AddressingMode) -> int:
+        return OPCODES[MNEMONIC_IDS[mnemonic] * MODE_COUNT + am.value]
+
+    def legal(mnemonic: str, am: AddressingMode) -> bool:
+        return bool(LEGAL_MODES[MNEMONIC_IDS[mnemonic]] >> am.value & 1)
+
+    assert opcode("RET", AddressingMode.SFX) == 0x01
+    assert opcode("BRLE", AddressingMode.X) == 0x27
+    assert opcode("BRLE", AddressingMode.SX) == INVALID_OPCODE
+    assert opcode("LDWA", AddressingMode.SFX) == 0xC7
+    assert legal("LDWA", AddressingMode.I) and not legal(
+        "STWA", AddressingMode.I
+    )
+    assert legal("CALL", AddressingMode.X) and not legal(
+        "CALL", AddressingMode.S
+    )
+    assert not legal("NOP", AddressingMode.I)
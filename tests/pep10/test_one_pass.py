@@ -0,0 +1,37 @@
+import io
+
+from cs6th_ch7.pep10.code_gen import calculate_addresses, program_object_code
+from cs6th_ch7.pep10.one_pass import OnePassAssembler, assemble
+from cs6th_ch7.pep10.parser import Parser, parse
+from cs6th_ch7.pep10.symbol import SymbolTable
+
+
+def test_forward_reference_patched():
+    text = "BR main,i\nLDWA cat,d\ncat: ADDA 1,i\nmain: STWA cat,d\n"
+    st = SymbolTable()
+    assembler = OnePassAssembler()
+    parser = Parser(io.StringIO(text), st)
+    assembler.feed(next(parser))
+    # Not yet defined, so written as zero.
+    assert assembler.object_code == bytearray([0x24, 0x00, 0x00])
+    for line in parser:
+        assembler.feed(line)
+    object_code, errors = assembler.finish()
+    assert errors == []
+    assert int(st["cat"]) == 6 and int(st["main"]) == 9
+    expected, _ = calculate_addresses(parse(text))
+    assert object_code == program_object_code(expected)
+
+
+def test_same_errors_as_calculate_addresses():
+    text = "LDWA fish,d\ncat: ADDA 1,i\nLDWA 0x,i\ncat: STWA fish,d\nBR cat,i\n"
+    _, expected = calculate_addresses(parse(text))
+    _, errors = assemble(Parser(io.StringIO(text)))
+    assert errors == expected
+    assert errors == [
+        "Undefined symbol: fish",
+        "Multiply defined symbol: cat",
+        ";ERROR: Missing argument",
+        "Multiply defined symbol: cat",
+        "Undefined symbol: fish",
+    ]
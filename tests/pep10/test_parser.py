@@ -19,7 +19,11 @@ from cs6th_ch7.pep10.ir import (
 )
 from cs6th_ch7.pep10.macro import MacroRegistry
 from cs6th_ch7.pep10.mnemonics import AddressingMode
-from cs6th_ch7.pep10.parser import Parser, parse
+from cs6th_ch7.pep10.parser import Parser, parse, parse_file, parse_parallel
+from cs6th_ch7.pep10.parser import split_lines
+from cs6th_ch7.pep10.symbol import SymbolTable
+from cs6th_ch7.pep10.regex_lexer import RegexLexer
+from cs6th_ch7.pep10.dfa_lexer import DFALexer
 
 
 @pytest.mark.skip("Implement in Problem 7.##")
@@ -142,6 +146,88 @@ def test_parser_synchronization() -> None:
     assert len(ret) == 3
 
 
+@pytest.mark.parametrize("columnar", [False, True])
+def test_statement_error_messages(columnar) -> None:
+    text = "0x10,i\nx: ;c\nFOO 1,i\nLDWA\nBR 1,sf\nBR 1,q\n"
+    ret = cast(list[ErrorLine], parse(text, columnar=columnar))
+    assert [line.comment for line in ret] == [
+        "Failed to parse line",
+        "Symbol declaration must be followed by instruction",
+        "Unrecognized mnemonic: FOO",
+        "Missing argument",
+        "Invalid addressing mode SF for BR",
+        "Unknown addressing mode: Q",
+    ]
+
+
+@pytest.mark.parametrize("lexer_type", [RegexLexer, DFALexer])
+def test_lexer_engines_agree(lexer_type) -> None:
+    text = "cat: BR 0x10,x ;c\n\nADDA -5,sfx\nNOPN HELLO: -\nRET\n;x\n"
+    expected = [repr(line) for line in parse(text)]
+    actual = [repr(line) for line in parse(text, lexer_type=lexer_type)]
+    assert actual == expected
+
+
+def test_parse_file(tmp_path) -> None:
+    text = "cat: BR 0x10,x ;c\n\nADDA -5,sfx\nNOPN HELLO: -\nRET\n;ü\n\n"
+    path = tmp_path / "prog.pep"
+    path.write_text(text, encoding="utf-8")
+    expected = [repr(line) for line in parse(text)]
+    assert [repr(line) for line in parse_file(path)] == expected
+
+    path.write_bytes(b"")
+    assert [repr(line) for line in parse_file(path)] == ["EmptyLine()"]
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        b"LDWA 1,i ;hi\r\nADDA -\r\n5,i\r\nBR 0x\r\nRET\r\n",
+        b"LDWA 1,i ;hi\rADDA -\r5,i\r\r;\xc3\xbc\rRET\r",
+        b"LDWA\x1c1,i\x1d;c\x1e\nADDA\x1f0x10,\x0bi\x0c\n\x1c\n",
+        b"x: NOPN ;\xc3\xa9\r\n-\r\n\xc3\xa9: RET\r\n",
+    ],
+)
+def test_parse_file_reads_as_text(tmp_path, data) -> None:
+    path = tmp_path / "prog.pep"
+    path.write_bytes(data)
+    with open(path, "r", encoding="utf-8") as f:
+        expected = [repr(line) for line in parse(f.read())]
+    actual = [repr(line) for line in parse_file(path, encoding="utf-8")]
+    assert actual == expected
+
+
+@pytest.mark.parametrize("encoding", ["latin-1", "utf-16"])
+def test_parse_file_encoding(tmp_path, encoding) -> None:
+    text = "LDWA 1,i ;\xe9\n\xe9: RET\n"
+    path = tmp_path / "prog.pep"
+    path.write_text(text, encoding=encoding)
+    expected = [repr(line) for line in parse(text)]
+    actual = [repr(line) for line in parse_file(path, encoding=encoding)]
+    assert actual == expected
+
+
+def test_split_lines() -> None:
+    text = "LDWA 1,i\nADDA 0x\nRET\nSTWA -\nx: NOPN\n"
+    chunks = split_lines(text, 5)
+    assert "".join(chunks) == text
+    # Never after a line whose "\n" an Invalid token may swallow.
+    assert chunks == ["LDWA 1,i\n", "ADDA 0x\nRET\n", "STWA -\nx: NOPN\n"]
+
+
+def test_parse_parallel() -> None:
+    text = "cat: BR dog,x\nLDWA 0x\nSTWA 1,d\n\ndog: ADDA cat,i\ncat: RET\n" * 8
+    st, expected_st = SymbolTable(), SymbolTable()
+    expected = parse(text, expected_st)
+    actual = parse_parallel(text, st, jobs=3)
+    assert [repr(line) for line in actual] == [repr(line) for line in expected]
+    assert list(st) == list(expected_st) == ["cat", "dog"]
+    assert st["cat"].definition_count == 16 and st["dog"].definition_count == 8
+    # Every line refers to the merged entries.
+    assert actual[0].symbol_decl == st["cat"]
+    assert actual[0].operand_spec.symbol == st["dog"]
+
+
 @pytest.mark.skip("Implement in Problem 7.##")
 @typing.no_type_check
 def test_dot_ASCII() -> None:
@@ -0,0 +1,49 @@
+import io
+
+from cs6th_ch7.pep10.code_gen import calculate_addresses, program_listing
+from cs6th_ch7.pep10.code_gen import program_object_code
+from cs6th_ch7.pep10.one_pass import Diagnostics
+from cs6th_ch7.pep10.parser import parse
+from cs6th_ch7.pep10.pipeline import address_stream, assemble_stream
+from cs6th_ch7.pep10.pipeline import parse_stream
+
+PROGRAM = """\
+cat: BR dog,i ;forward
+;comment
+dog: ADDA 0x10,d
+
+CALL cat,x
+STBX -1,sfx   \n\n  \n"""
+
+
+def test_parse_stream_matches_parse():
+    for text in [PROGRAM, "", "\n \n", "LDWA 1,i", "\n\nLDWA 0x\nRET\n"]:
+        expected = [repr(line) for line in parse(text)]
+        assert [
+            repr(line) for line in parse_stream(io.StringIO(text))
+        ] == expected
+
+
+def test_address_stream_holds_forward_references():
+    lines = parse_stream(io.StringIO(PROGRAM))
+    addressed = address_stream(lines, Diagnostics())
+    # Nothing can be released until dog is declared.
+    first = next(addressed)
+    assert first.memory_address == 0 and int(first.operand_spec) == 3
+    assert [line.source() for line in addressed] == [
+        line.source() for line in parse(PROGRAM)[1:]
+    ]
+
+
+def test_assemble_stream():
+    ir, errors = calculate_addresses(parse(PROGRAM))
+    object_out, listing_out = io.BytesIO(), io.StringIO()
+    assert assemble_stream(io.StringIO(PROGRAM), object_out, listing_out) == []
+    assert object_out.getvalue() == program_object_code(ir)
+    assert listing_out.getvalue().splitlines() == program_listing(ir)
+
+
+def test_assemble_stream_errors():
+    text = "LDWA fish,d\ncat: ADDA 1,i\nLDWA 0x,i\ncat: STWA fish,d\n"
+    _, expected = calculate_addresses(parse(text))
+    assert assemble_stream(io.StringIO(text)) == expected
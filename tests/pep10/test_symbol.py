@@ -1,4 +1,7 @@
-from cs6th_ch7.pep10.symbol import SymbolTable, add_OS_symbols
+import pickle
+import pytest
+
+from cs6th_ch7.pep10.symbol import OS_SYMBOLS, SymbolTable, add_OS_symbols
 
 
 # Referring to the same symbol in different places accesses the same underlying object.
@@ -42,6 +45,13 @@ def test_value_assignment():
     s0.value = 5
     assert s0.value == 5
     assert int(s0) == 5
+    s0.value = -(2**31) + 1
+    assert s0.value == -(2**31) + 1
+    # The remaining 32-bit value means "no value", so it is refused too.
+    for value in (-(2**31), 2**31):
+        with pytest.raises(ValueError):
+            s0.value = value
+    assert s0.value == -(2**31) + 1 and s0.version == 2
 
 
 def tst_os_symbols():
@@ -50,3 +60,72 @@ def tst_os_symbols():
     assert "charIn" in tb and "charOut" in tb and "pwrOff" in tb
     for s in {"DECI", "DECO", "STRO", "HEXO", "SNOP"}:
         assert s in tb
+
+
+def test_ids_and_arrays():
+    tb = SymbolTable()
+    cat, dog = tb.define("cat"), tb.reference("dog")
+    assert (cat.id, dog.id) == (0, 1) and tb.symbol_id("dog") == 1
+    assert tb.entry(1) == dog and list(tb) == ["cat", "dog"]
+    cat.value = 7
+    assert list(tb.definition_counts) == [1, 0]
+    assert tb.values[0] == 7 and dog.value is None
+    assert cat.version == 1 and dog.version == 0
+
+
+def test_merge():
+    tb, other = SymbolTable(), SymbolTable()
+    tb.define("cat")
+    other.reference("dog")
+    other.define("cat")
+    ids = tb.merge(other)
+    assert ids == [tb.symbol_id("dog"), tb.symbol_id("cat")] == [1, 0]
+    assert tb["cat"].is_multiply_defined() and tb["dog"].is_undefined()
+
+
+def test_pickle_keeps_views_of_copy():
+    tb = SymbolTable()
+    add_OS_symbols(tb)
+    entries = [tb.reference("charIn"), tb.reference("cat")]
+    copy, copied = pickle.loads(pickle.dumps((tb, entries)))
+    assert copied[0] == copy["charIn"] and copied[1] == copy["cat"]
+    assert copied[0].table is copy and copied[0] != tb.reference("charIn")
+    assert int(copy["charIn"]) == 0xFFFD and copy["cat"].is_undefined()
+
+
+def test_pickle_overlay():
+    job = SymbolTable(OS_SYMBOLS)
+    job.define("charIn").value = 0x10
+    job.define("cat").value = 3
+    copy = pickle.loads(pickle.dumps(job))
+    assert copy._base is OS_SYMBOLS
+    assert int(copy["charIn"]) == 0x10 and copy["charIn"].definition_count == 2
+    assert int(copy["cat"]) == 3 and int(copy["charOut"]) == 0xFFFE
+    assert list(copy) == list(job)
+    assert pickle.loads(pickle.dumps(OS_SYMBOLS)) is OS_SYMBOLS
+    with pytest.raises(TypeError):
+        pickle.dumps(SymbolTable().freeze())
+
+
+def test_frozen_base_table():
+    with pytest.raises(TypeError):
+        OS_SYMBOLS["charIn"].value = 0
+    with pytest.raises(TypeError):
+        OS_SYMBOLS.define("charIn")
+    with pytest.raises(TypeError):
+        OS_SYMBOLS.reference("cat")
+    assert "cat" not in OS_SYMBOLS
+
+
+def test_overlay_shadows_on_write():
+    job, other = SymbolTable(OS_SYMBOLS), SymbolTable(OS_SYMBOLS)
+    assert "charIn" in job and int(job["charIn"]) == 0xFFFD
+    job.define("charIn").value = 0x10
+    job.define("cat")
+    assert job["charIn"].is_multiply_defined() and int(job["charIn"]) == 0x10
+    assert list(job) == list(OS_SYMBOLS) + ["cat"]
+    # Neither the base nor another job sees the change.
+    assert int(OS_SYMBOLS["charIn"]) == int(other["charIn"]) == 0xFFFD
+    assert not other["charIn"].is_multiply_defined() and "cat" not in other
+    with pytest.raises(KeyError):
+        other["cat"]
@@ -0,0 +1,39 @@
+import pytest
+
+from cs6th_ch7.pep10 import code_gen, vectorized
+from cs6th_ch7.pep10.compact import CompactProgram
+from cs6th_ch7.pep10.parser import parse
+
+pytest.importorskip("numpy")
+
+PROGRAM = """\
+cat: BR 3,i ;skip
+dog: ADDA 0x10,d
+
+;comment
+cat: LDWA dog,x
+STBX -1,sfx
+BR fish,i
+LDWA 0x,i
+ADDA 1,d
+"""
+
+
+def test_vectorized_addresses():
+    expected, expected_errors = code_gen.compact_addresses(
+        CompactProgram(parse(PROGRAM)), base_address=0x10
+    )
+    program, errors = vectorized.compact_addresses(
+        CompactProgram(parse(PROGRAM)), base_address=0x10
+    )
+    assert errors == expected_errors
+    assert len(errors) == 4
+    assert len(program) == len(expected) == 8
+    assert list(program.addresses) == list(expected.addresses)
+    assert list(program.kinds) == list(expected.kinds)
+    assert program.comments == expected.comments
+    assert code_gen.program_listing(program) == code_gen.program_listing(
+        expected
+    )
+    values = [symbol.value for symbol in program.symbols]
+    assert values == [symbol.value for symbol in expected.symbols]
@@ -0,0 +1,57 @@
+from io import StringIO
+
+import pytest
+
+from cs6th_ch7.pep10.columnar import ColumnBuffer, tokenize_columns
+from cs6th_ch7.pep10.lexer import Lexer
+import cs6th_ch7.pep10.tokens as tokens
+from cs6th_ch7.utils.buffer import ParserBuffer
+
+
+def parser_buffer(text: str):
+    return ParserBuffer(Lexer(StringIO(text)))
+
+
+def column_buffer(text: str):
+    return ColumnBuffer(tokenize_columns(text))
+
+
+@pytest.fixture(params=[parser_buffer, column_buffer])
+def make_buffer(request):
+    return request.param
+
+
+def test_peek_lookahead(make_buffer):
+    buffer = make_buffer("a: b 5\n")
+    assert buffer.peek(2) == tokens.Decimal(5)
+    assert buffer.peek(3) == tokens.EMPTY
+    assert buffer.peek(4) is None
+    assert buffer.peek() == tokens.Symbol("a")
+    assert buffer.must_match(tokens.Symbol) == tokens.Symbol("a")
+    assert buffer.peek(1) == tokens.Decimal(5)
+
+
+def test_mark_reset(make_buffer):
+    buffer = make_buffer("a b c\n")
+    buffer.mark()
+    assert buffer.must_match(tokens.Identifier) == tokens.Identifier("a")
+    buffer.mark()
+    assert buffer.must_match(tokens.Identifier) == tokens.Identifier("b")
+    buffer.reset()
+    assert buffer.peek() == tokens.Identifier("b")
+    buffer.reset()
+    assert buffer.peek() == tokens.Identifier("a")
+
+    buffer.mark()
+    buffer.must_match(tokens.Identifier)
+    buffer.release()
+    assert buffer.peek() == tokens.Identifier("b")
+
+
+def test_reset_after_skip(make_buffer):
+    buffer = make_buffer("a b\nc\n")
+    buffer.mark()
+    buffer.skip_to_next_line({tokens.Empty})
+    assert buffer.peek() == tokens.Identifier("c")
+    buffer.reset()
+    assert buffer.peek() == tokens.Identifier("a")